@@ -4,17 +4,46 @@
 
 用法:
     python download_sdk.py --language <LANGUAGE_ID>
+    python download_sdk.py --language GO,PYTHON
+    python download_sdk.py --language all
     python download_sdk.py --list
 
 支持的语言:
     GO, CPP, JAVA, PYTHON, NODEJS, PHP, CSHARP
+
+指定多个语言（逗号分隔）或 all 时并发下载，最后输出每个语言结果组成的 JSON 数组
+
+本地镜像:
+    下载过的文件按 SHA-256 保存在 ~/.cache/zego-server-assistant 中（环境变量 ZEGO_SDK_MIRROR 可指定目录，
+    设为 off 时不使用镜像），再次下载时通过 ETag 向服务端确认，未变化则直接使用镜像
+    --offline            只使用本地镜像，不访问网络
+    --ref <分支|提交>    指定 SDK 仓库的版本，指定提交时镜像中已有的文件不再向服务端确认
+    --lock <文件>        按锁定文件中的 ref 和 SHA-256 下载并校验，新下载的语言会记录到锁定文件中
 """
 
 import argparse
+import asyncio
+import hashlib
+import json
 import os
+import re
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from urllib.request import urlopen
+from urllib.error import HTTPError
+from urllib.parse import quote
+from urllib.request import Request, urlopen
+
+# SDK 仓库的默认版本，SDK_URLS 中的地址都指向这个分支
+DEFAULT_SDK_REF = "refs/heads/release/github"
+# SDK 仓库地址，写入锁定文件前通过 git ls-remote 将分支或标签解析为提交
+SDK_REPO_URL = "https://github.com/zegoim/zego_server_assistant.git"
 
 # SDK 下载地址映射
 SDK_URLS = {
@@ -38,6 +67,14 @@ FILE_NAMES = {
     "CSHARP": "GenerateToken.cs",
 }
 
+# 下载时每次读取的字节数，边下载边写入文件
+CHUNK_SIZE = 64 * 1024
+
+# 本地 SDK 镜像：objects/ 下按 SHA-256 保存文件，index.json 记录每个 URL 的 ETag 和摘要
+# ZEGO_SDK_MIRROR 指定镜像目录，设为 off/0/false 时不使用镜像
+MIRROR_ENV = "ZEGO_SDK_MIRROR"
+_mirror_lock = threading.Lock()
+
 # 各语言的常见 SDK 目录（按优先级排序）
 LANGUAGE_SDK_DIRS = {
     "GO": [
@@ -106,6 +143,69 @@ FRAMEWORK_MARKERS = {
 }
 
 
+def get_mirror_dir() -> Path | None:
+    """获取本地 SDK 镜像目录，禁用镜像时返回 None"""
+    mirror = os.environ.get(MIRROR_ENV)
+    if mirror:
+        if mirror.lower() in ("off", "0", "false"):
+            return None
+        return Path(mirror).expanduser()
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "zego-server-assistant"
+
+
+def get_sdk_url(lang: str, ref: str | None = None) -> str:
+    """获取某个语言在指定版本（分支、标签或提交）下的下载地址"""
+    if not ref or ref == DEFAULT_SDK_REF:
+        return SDK_URLS[lang]
+    return SDK_URLS[lang].replace(f"/{DEFAULT_SDK_REF}/", f"/{quote(ref, safe='/')}/", 1)
+
+
+def is_commit(ref: str | None) -> bool:
+    """ref 是否是完整的提交 ID，提交对应的文件内容不会再变化"""
+    return bool(ref) and re.fullmatch(r"[0-9a-f]{40}", ref) is not None
+
+
+def resolve_commit(ref: str) -> str:
+    """
+    将 SDK 仓库的分支或标签解析为提交 ID（git ls-remote，不需要克隆仓库）
+
+    Args:
+        ref: 分支、标签或提交，例如 refs/heads/release/github、release/github
+
+    Returns:
+        40 位提交 ID；ref 本身是提交 ID 时直接返回
+
+    Raises:
+        ValueError: git 命令不可用、访问仓库失败或仓库中没有该 ref
+    """
+    if is_commit(ref):
+        return ref
+    try:
+        result = subprocess.run(
+            # 附注标签需要同时匹配 ^{} 才会返回其指向的提交
+            ["git", "ls-remote", SDK_REPO_URL, ref, f"{ref}^{{}}"],
+            capture_output=True, text=True, timeout=30, check=True,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"}, stdin=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        raise ValueError("未找到 git 命令，无法将 ref 解析为提交")
+    except subprocess.TimeoutExpired:
+        raise ValueError("git ls-remote 超时")
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"git ls-remote 失败: {e.stderr.strip()}")
+
+    refs = {}
+    for line in result.stdout.splitlines():
+        commit, _, name = line.partition("\t")
+        refs[name] = commit
+    # 附注标签优先使用 ^{} 指向的提交
+    for name in (f"{ref}^{{}}", ref, f"refs/heads/{ref}", f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}"):
+        if name in refs:
+            return refs[name]
+    raise ValueError(f"SDK 仓库中没有 {ref}")
+
+
 def get_workspace_root() -> Path:
     """获取 workspace 根目录"""
     # 从环境变量获取
@@ -209,34 +309,348 @@ def determine_output_dir(workspace_root: Path, lang: str) -> tuple[Path, str]:
     return workspace_root / "zego" / "token", 'default'
 
 
-def download_file(url: str, target_path: Path) -> bool:
-    """下载文件到目标路径"""
+def _stream_to_temp(response, directory: Path) -> tuple[Path, str, int]:
+    """
+    将响应流式写入 directory 下的临时文件，同时计算 SHA-256
+
+    Returns:
+        (临时文件路径, SHA-256, 文件大小)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = _temp_path(directory)
+    try:
+        with open(temp_path, 'xb') as f:
+            while chunk := response.read(CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
+    return temp_path, digest.hexdigest(), size
+
+
+def _temp_path(directory: Path) -> Path:
+    """directory 下唯一的临时文件路径，用普通方式创建文件以保留默认的文件权限"""
+    return directory / f".{uuid.uuid4().hex}.part"
+
+
+def _check_digest(actual: str, expected: str | None):
+    """校验 SHA-256，不一致时抛出 ValueError"""
+    if expected and actual != expected:
+        raise ValueError(f"SHA-256 不匹配: 期望 {expected}，实际 {actual}")
+
+
+def read_mirror_index(mirror: Path) -> dict:
+    """读取镜像索引 {URL: {"sha256", "size", "etag", "last_modified", "fetched_at"}}"""
     try:
-        print(f"正在下载: {url}")
+        with open(mirror / "index.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def _mirror_index_lock(mirror: Path):
+    """
+    锁定镜像索引的读-改-写（进程内用线程锁，进程间在支持时用文件锁），镜像由同一用户的多个进程共享
+    """
+    with _mirror_lock:
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(mirror / ".index.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _update_mirror_index(mirror: Path, url: str, entry: dict):
+    """更新镜像索引中的一条记录，先写临时文件再替换，避免索引被写坏"""
+    with _mirror_index_lock(mirror):
+        index = read_mirror_index(mirror)
+        index[url] = entry
+        fd, temp_name = tempfile.mkstemp(dir=mirror, prefix=".index.", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(temp_name, mirror / "index.json")
+
+
+def fetch_to_mirror(url: str, mirror: Path, offline: bool = False, sha256: str | None = None,
+                    immutable: bool = False) -> dict:
+    """
+    通过本地镜像获取文件
+
+    - 镜像中已有 sha256 对应的文件时直接使用，不访问网络
+    - immutable（URL 指向固定提交）或离线模式下，镜像中已有该 URL 的文件时直接使用
+    - 其他情况带上 If-None-Match / If-Modified-Since 向服务端确认，返回 304 时使用镜像中的文件
+
+    Args:
+        url: 文件 URL
+        mirror: 镜像目录
+        offline: 离线模式，不访问网络
+        sha256: 期望的 SHA-256（可选）
+        immutable: URL 的内容是否不会再变化
+
+    Returns:
+        {"blob": 镜像中的文件路径, "sha256", "size", "source": "mirror" | "revalidated" | "network"}
+
+    Raises:
+        FileNotFoundError: 离线模式下镜像中没有该文件
+        ValueError: SHA-256 与期望值不一致
+    """
+    objects_dir = mirror / "objects"
+    if sha256 and (objects_dir / sha256).is_file():
+        blob = objects_dir / sha256
+        return {"blob": blob, "sha256": sha256, "size": blob.stat().st_size, "source": "mirror"}
+
+    entry = read_mirror_index(mirror).get(url)
+    if entry and not (objects_dir / entry["sha256"]).is_file():
+        entry = None
+    if entry and sha256 and entry["sha256"] != sha256:
+        # 镜像中的版本与固定的摘要不同，重新下载后再校验
+        entry = None
+    if entry and (offline or immutable):
+        return {"blob": objects_dir / entry["sha256"], "sha256": entry["sha256"], "size": entry["size"],
+                "source": "mirror"}
+    if offline:
+        raise FileNotFoundError(f"离线模式下本地镜像中没有该文件: {url}")
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        with urlopen(Request(url, headers=headers), timeout=30) as response:
+            temp_path, digest, size = _stream_to_temp(response, objects_dir)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+    except HTTPError as e:
+        if e.code == 304 and entry:
+            return {"blob": objects_dir / entry["sha256"], "sha256": entry["sha256"], "size": entry["size"],
+                    "source": "revalidated"}
+        raise
+
+    try:
+        _check_digest(digest, sha256)
+        os.replace(temp_path, objects_dir / digest)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    _update_mirror_index(mirror, url, {
+        "sha256": digest,
+        "size": size,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": int(time.time()),
+    })
+    return {"blob": objects_dir / digest, "sha256": digest, "size": size, "source": "network"}
+
+
+def fetch_to_file(url: str, target_path: Path, mirror: Path | None = None, offline: bool = False,
+                  sha256: str | None = None, immutable: bool = False) -> dict:
+    """
+    下载文件到目标路径
+
+    指定镜像目录时先通过镜像获取（见 fetch_to_mirror），再复制到目标路径；否则直接流式下载。
+    都是先写入同目录下的临时文件再替换目标文件，失败时不会留下不完整的文件
+
+    Args:
+        url: 文件 URL
+        target_path: 目标文件路径
+        mirror: 镜像目录，为 None 时不使用镜像
+        offline: 离线模式，不访问网络
+        sha256: 期望的 SHA-256（可选）
+        immutable: URL 的内容是否不会再变化
+
+    Returns:
+        {"size", "sha256", "source"}
+    """
+    # 确保目标目录存在
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if mirror is None:
+        if offline:
+            raise FileNotFoundError("离线模式需要本地镜像，请不要将 ZEGO_SDK_MIRROR 设为 off")
         with urlopen(url, timeout=30) as response:
-            content = response.read()
+            temp_path, digest, size = _stream_to_temp(response, target_path.parent)
+        try:
+            _check_digest(digest, sha256)
+            os.replace(temp_path, target_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        return {"size": size, "sha256": digest, "source": "network"}
+
+    info = fetch_to_mirror(url, mirror, offline, sha256, immutable)
+    # 复制而不是链接：目标文件属于项目代码，之后可能被修改
+    temp_path = _temp_path(target_path.parent)
+    try:
+        shutil.copyfile(info["blob"], temp_path)
+        os.replace(temp_path, target_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    return {"size": info["size"], "sha256": info["sha256"], "source": info["source"]}
 
-        # 确保目标目录存在
-        target_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # 写入文件
-        with open(target_path, 'wb') as f:
-            f.write(content)
+def download_file(url: str, target_path: Path, mirror: Path | None = None, offline: bool = False,
+                  sha256: str | None = None, immutable: bool = False) -> dict | None:
+    """下载文件到目标路径，返回 {"size", "sha256", "source"}，失败时返回 None"""
+    try:
+        print(f"正在下载: {url}")
+        info = fetch_to_file(url, target_path, mirror, offline, sha256, immutable)
 
         print(f"下载成功: {target_path}")
-        print(f"文件大小: {len(content)} 字节")
-        return True
+        print(f"文件大小: {info['size']} 字节")
+        return info
 
     except Exception as e:
         print(f"下载失败: {str(e)}", file=sys.stderr)
-        return False
+        return None
+
+
+def parse_languages(value: str) -> list[str]:
+    """
+    解析 --language 参数
+
+    Args:
+        value: 单个语言、逗号分隔的多个语言，或 all
+
+    Returns:
+        去重后的语言列表（保持输入顺序）
+
+    Raises:
+        ValueError: 包含不支持的语言
+    """
+    if value.strip().lower() == "all":
+        return list(SDK_URLS)
+
+    languages = []
+    for item in value.split(","):
+        lang = item.strip().upper()
+        if not lang:
+            continue
+        if lang not in SDK_URLS:
+            raise ValueError(f"不支持的语言 '{lang}'")
+        if lang not in languages:
+            languages.append(lang)
+    if not languages:
+        raise ValueError("请指定至少一个语言")
+    return languages
+
+
+def read_lock_file(path: Path) -> dict:
+    """
+    读取锁定文件 {语言: {"ref": 提交 ID, "sha256": 文件摘要}}，文件不存在时返回空字典
+
+    Raises:
+        ValueError: 锁定文件格式错误
+    """
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        pins = json.load(f)
+    if not isinstance(pins, dict):
+        raise ValueError(f"锁定文件格式错误: {path}")
+
+    for lang, pin in pins.items():
+        if (not isinstance(pin, dict) or not isinstance(pin.get("ref"), str) or not pin["ref"]
+                or not isinstance(pin.get("sha256"), str) or not re.fullmatch(r"[0-9a-f]{64}", pin["sha256"])):
+            raise ValueError(f"{lang} 的记录格式错误，应为 {{\"ref\": 提交 ID, \"sha256\": 64 位十六进制摘要}}")
+        if not is_commit(pin["ref"]):
+            print(f"警告: 锁定文件中 {lang} 的 ref 不是提交 ID（{pin['ref']}），分支移动后将无法复现", file=sys.stderr)
+    return {lang.upper(): pin for lang, pin in pins.items()}
+
+
+def write_lock_file(path: Path, pins: dict):
+    """写入锁定文件，按语言排序以便纳入版本控制"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(pins.items())), f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def resolve_source(lang: str, ref: str | None = None, pins: dict | None = None) -> tuple[str, str, str | None]:
+    """
+    确定某个语言的下载地址、版本和期望摘要，锁定文件中的记录优先于 ref 参数（main 中会对此给出警告）
+
+    Returns:
+        (URL, ref, 期望的 SHA-256 或 None)
+    """
+    pin = (pins or {}).get(lang) or {}
+    ref = pin.get("ref") or ref or DEFAULT_SDK_REF
+    return get_sdk_url(lang, ref), ref, pin.get("sha256")
+
+
+async def download_languages(languages: list[str], workspace_root: Path, output_dir: Path | None = None,
+                             ref: str | None = None, pins: dict | None = None,
+                             mirror: Path | None = None, offline: bool = False) -> list[dict]:
+    """
+    并发下载多个语言的 SDK
+
+    每个语言的下载在线程中执行（urllib 是阻塞的），由 asyncio 并发调度，
+    单个语言失败不影响其他语言
+
+    Args:
+        languages: 语言列表
+        workspace_root: workspace 根目录，未指定 output_dir 时按语言确定各自的输出目录
+        output_dir: 输出目录（可选），所有语言的文件都保存到这个目录
+        ref: 分支、标签或提交（可选），默认使用 release/github 分支
+        pins: 锁定文件的内容（可选），见 read_lock_file
+        mirror: 本地镜像目录，为 None 时不使用镜像
+        offline: 离线模式，只使用本地镜像
+
+    Returns:
+        [{"language", "filename", "path", "ref", "success", "size"/"sha256"/"source" 或 "error"}, ...]，
+        顺序与 languages 一致
+    """
+    async def download_one(lang: str) -> dict:
+        if output_dir is not None:
+            output_path = output_dir / FILE_NAMES[lang]
+        else:
+            lang_dir, _ = await asyncio.to_thread(determine_output_dir, workspace_root, lang)
+            output_path = lang_dir / FILE_NAMES[lang]
+
+        url, lang_ref, sha256 = resolve_source(lang, ref, pins)
+        result = {"language": lang, "filename": FILE_NAMES[lang], "path": str(output_path), "ref": lang_ref}
+        print(f"正在下载: {url}")
+        try:
+            info = await asyncio.to_thread(fetch_to_file, url, output_path, mirror, offline, sha256,
+                                           is_commit(lang_ref))
+            result.update(info)
+            result["success"] = True
+            print(f"下载成功: {output_path}")
+        except Exception as e:
+            result["success"] = False
+            result["error"] = str(e)
+            print(f"下载失败 ({lang}): {str(e)}", file=sys.stderr)
+        return result
+
+    return list(await asyncio.gather(*(download_one(lang) for lang in languages)))
 
 
 def main():
     parser = argparse.ArgumentParser(description="下载 ZEGO Server Assistant SDK")
-    parser.add_argument("--language", "-l", help="SDK 语言 (GO, CPP, JAVA, PYTHON, NODEJS, PHP, CSHARP)")
-    parser.add_argument("--output", "-o", help="输出文件路径（可选）")
+    parser.add_argument("--language", "-l",
+                        help="SDK 语言 (GO, CPP, JAVA, PYTHON, NODEJS, PHP, CSHARP)，多个语言用逗号分隔，all 表示全部")
+    parser.add_argument("--output", "-o", help="输出文件路径（可选）；指定多个语言时为输出目录")
     parser.add_argument("--list", action="store_true", help="列出所有支持的语言")
+    parser.add_argument("--ref", help=f"SDK 仓库的分支、标签或提交（可选），默认 {DEFAULT_SDK_REF}")
+    parser.add_argument("--offline", action="store_true", help="离线模式，只使用本地镜像中的文件")
+    parser.add_argument("--lock", help="锁定文件路径（可选）：存在时按其中的 ref 和 SHA-256 下载并校验，"
+                                       "下载成功后记录新语言的版本")
 
     args = parser.parse_args()
 
@@ -253,18 +667,57 @@ def main():
         print("\n错误: 请指定 --language 参数")
         return 1
 
-    lang = args.language.upper()
-
     # 验证语言是否支持
-    if lang not in SDK_URLS:
-        print(f"错误: 不支持的语言 '{lang}'", file=sys.stderr)
+    try:
+        languages = parse_languages(args.language)
+    except ValueError as e:
+        print(f"错误: {str(e)}", file=sys.stderr)
         print(f"支持的语言: {', '.join(SDK_URLS.keys())}", file=sys.stderr)
         return 1
 
+    lock_path = Path(args.lock) if args.lock else None
+    try:
+        pins = read_lock_file(lock_path) if lock_path else {}
+    except (OSError, ValueError) as e:
+        print(f"错误: 读取锁定文件失败: {str(e)}", file=sys.stderr)
+        return 1
+    mirror = get_mirror_dir()
+
+    ref = args.ref
+    pinned = [lang for lang in languages if lang in pins]
+    if ref and pinned:
+        print(f"警告: {', '.join(pinned)} 已在锁定文件中固定版本，忽略 --ref {ref}；"
+              f"删除锁定文件中的对应记录后才能更新", file=sys.stderr)
+    if lock_path and len(pinned) < len(languages):
+        # 新写入锁定文件的语言固定到提交，分支之后移动也能下载到相同的内容
+        requested = ref or DEFAULT_SDK_REF
+        try:
+            ref = resolve_commit(requested)
+        except ValueError as e:
+            print(f"错误: 无法将 {requested} 解析为提交，不能写入锁定文件: {str(e)}", file=sys.stderr)
+            return 1
+        if ref != requested:
+            print(f"已将 {requested} 解析为提交 {ref}")
+
     # 获取 workspace 根目录
     workspace_root = get_workspace_root()
     print(f"工作目录: {workspace_root}")
 
+    # 多个语言：并发下载，输出 JSON 数组
+    if len(languages) > 1 or args.language.strip().lower() == "all":
+        output_dir = Path(args.output) if args.output else None
+        results = asyncio.run(download_languages(languages, workspace_root, output_dir, ref, pins,
+                                                 mirror, args.offline))
+        if lock_path:
+            for result in results:
+                if result["success"] and result["language"] not in pins:
+                    pins[result["language"]] = {"ref": result["ref"], "sha256": result["sha256"]}
+            write_lock_file(lock_path, pins)
+        print(f"\n{json.dumps(results, ensure_ascii=False)}")
+        return 0 if all(result["success"] for result in results) else 1
+
+    lang = languages[0]
+
     # 确定输出路径
     if args.output:
         output_path = Path(args.output)
@@ -275,14 +728,18 @@ def main():
         print(f"目录模式: {dir_mode}")
 
     # 获取 URL 和下载
-    url = SDK_URLS[lang]
-    success = download_file(url, output_path)
+    url, ref, sha256 = resolve_source(lang, ref, pins)
+    info = download_file(url, output_path, mirror, args.offline, sha256, is_commit(ref))
 
-    if not success:
+    if info is None:
         return 1
 
+    if lock_path and lang not in pins:
+        pins[lang] = {"ref": ref, "sha256": info["sha256"]}
+        write_lock_file(lock_path, pins)
+
     # 输出 JSON 格式供脚本调用
-    print(f"\n{{\"path\": \"{output_path}\", \"language\": \"{lang}\", \"filename\": \"{FILE_NAMES[lang]}\"}}")
+    print(f"\n{json.dumps({'path': str(output_path), 'language': lang, 'filename': FILE_NAMES[lang], 'ref': ref, **info}, ensure_ascii=False)}")
 
     return 0
 
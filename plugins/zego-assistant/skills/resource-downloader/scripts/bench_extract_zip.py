@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+_extract_zip 解压性能基准
+
+生成包含 10000 个成员（每个 200 B ~ 100 KB）的压缩（deflate）和未压缩（stored）zip，
+分别用 ZipFile.extractall 和不同线程数的 _extract_zip 解压，取多次运行的最短耗时，
+并检查解压结果与 extractall 逐字节一致。用于确认 EXTRACT_JOBS 的默认值在当前机器上是否合适。
+
+用法:
+    python bench_extract_zip.py
+    python bench_extract_zip.py --entries 10000 --jobs 1,2,4,8 --repeat 5 --workdir /tmp/zipbench
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import zipfile
+import argparse
+import filecmp
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import downloader  # noqa: E402
+
+# 成员大小的可选值（字节）
+ENTRY_SIZES = (200, 2000, 20000, 100000)
+
+
+def build_zip(path: Path, entries: int, compression: int):
+    """
+    生成测试用 zip，内容由固定随机种子决定
+
+    Args:
+        path: zip 文件路径
+        entries: 成员数量
+        compression: zipfile.ZIP_DEFLATED 或 zipfile.ZIP_STORED
+    """
+    rng = random.Random(0)
+    with zipfile.ZipFile(path, 'w', compression) as zip_ref:
+        for i in range(entries):
+            size = rng.choice(ENTRY_SIZES)
+            # 压缩包使用重复 4 次的随机数据，使其可以被压缩
+            if compression == zipfile.ZIP_STORED:
+                data = rng.randbytes(size)
+            else:
+                data = rng.randbytes(size // 4) * 4
+            zip_ref.writestr(f'sdk/mod{i % 50}/sub{i % 7}/file{i}.bin', data)
+        zip_ref.writestr('sdk/empty/', b'')
+
+
+def time_extract(extract, zip_path: Path, out_dir: Path, repeat: int) -> float:
+    """
+    多次解压到 out_dir，返回最短耗时（秒），最后一次的解压结果保留在 out_dir 中
+
+    Args:
+        extract: extract(zip_path, out_dir)
+        zip_path: zip 文件路径
+        out_dir: 解压目标目录
+        repeat: 运行次数
+
+    Returns:
+        最短耗时（秒）
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        shutil.rmtree(out_dir, ignore_errors=True)
+        start = time.perf_counter()
+        extract(zip_path, out_dir)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def same_tree(expected: Path, actual: Path) -> bool:
+    """检查两个目录下的文件列表和内容是否完全一致"""
+    expected_files = sorted(p.relative_to(expected) for p in expected.rglob('*') if p.is_file())
+    actual_files = sorted(p.relative_to(actual) for p in actual.rglob('*') if p.is_file())
+    if expected_files != actual_files:
+        return False
+    return all(filecmp.cmp(expected / p, actual / p, shallow=False) for p in expected_files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量 _extract_zip 在不同线程数下的解压耗时')
+    parser.add_argument('--entries', type=int, default=10000, help='zip 成员数量（默认 10000）')
+    parser.add_argument('--jobs', default=f'1,{downloader.EXTRACT_JOBS},8',
+                        help='逗号分隔的线程数列表（默认 1、EXTRACT_JOBS 和 8）')
+    parser.add_argument('--repeat', type=int, default=5, help='每项测量的运行次数，取最短耗时（默认 5）')
+    parser.add_argument('--workdir', help='生成 zip 和解压的目录，默认使用临时目录并在结束后删除')
+    args = parser.parse_args()
+
+    jobs_list = sorted({int(jobs) for jobs in args.jobs.split(',') if jobs.strip()})
+    print(f'CPU: {os.cpu_count()}，EXTRACT_JOBS 默认值: {downloader.EXTRACT_JOBS}')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workdir = Path(args.workdir or temp_dir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        identical = True
+        for name, compression in (('deflate', zipfile.ZIP_DEFLATED), ('stored', zipfile.ZIP_STORED)):
+            zip_path = workdir / f'bench_{name}_{args.entries}.zip'
+            if not zip_path.exists():
+                build_zip(zip_path, args.entries, compression)
+
+            expected = workdir / f'{name}_extractall'
+            elapsed = time_extract(lambda src, dst: zipfile.ZipFile(src).extractall(dst),
+                                   zip_path, expected, args.repeat)
+            print(f'{name:8} extractall          {elapsed:.2f}s')
+            for jobs in jobs_list:
+                out_dir = workdir / f'{name}_jobs{jobs}'
+                elapsed = time_extract(lambda src, dst: downloader._extract_zip(src, dst, jobs),
+                                       zip_path, out_dir, args.repeat)
+                print(f'{name:8} _extract_zip jobs={jobs:<2} {elapsed:.2f}s')
+                if not same_tree(expected, out_dir):
+                    print(f'{name} jobs={jobs}: 解压结果与 extractall 不一致', file=sys.stderr)
+                    identical = False
+                shutil.rmtree(out_dir)
+            shutil.rmtree(expected)
+
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
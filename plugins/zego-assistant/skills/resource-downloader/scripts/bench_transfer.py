@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+_download_file 传输性能基准
+
+在本机启动一个用 sendfile 返回随机数据文件的 HTTP 服务，不使用下载缓存，
+多次调用 _download_file 下载（包含 SHA-256 计算），输出最短耗时和吞吐量，并校验下载结果。
+
+用法:
+    python bench_transfer.py
+    python bench_transfer.py --size-mb 300 --repeat 3 --segments 4
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+import http.server
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import downloader  # noqa: E402
+
+
+def make_handler(blob: Path):
+    """创建返回 blob 内容的请求处理类，支持单个 Range 请求以便测试分段下载"""
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_HEAD(self):
+            self._respond(send_body=False)
+
+        def do_GET(self):
+            self._respond(send_body=True)
+
+        def _respond(self, send_body: bool):
+            size = blob.stat().st_size
+            start, end = 0, size - 1
+            range_header = self.headers.get('Range', '')
+            if range_header.startswith('bytes='):
+                first, _, last = range_header[len('bytes='):].partition('-')
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(end - start + 1))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', '"bench"')
+            self.end_headers()
+            if send_body:
+                with open(blob, 'rb') as f:
+                    self.connection.sendfile(f, start, end - start + 1)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量 _download_file 在本机 HTTP 服务上的传输吞吐量')
+    parser.add_argument('--size-mb', type=int, default=300, help='测试文件大小（MB，默认 300）')
+    parser.add_argument('--repeat', type=int, default=3, help='下载次数，取最短耗时（默认 3）')
+    parser.add_argument('--segments', type=int, default=1, help='最大分段数（默认 1，即单连接下载）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workdir = Path(temp_dir)
+        blob = workdir / 'blob.bin'
+        digest = hashlib.sha256()
+        with open(blob, 'wb') as f:
+            for _ in range(args.size_mb):
+                chunk = os.urandom(1024 * 1024)
+                digest.update(chunk)
+                f.write(chunk)
+
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), make_handler(blob))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]}/blob.bin'
+
+        best = float('inf')
+        ok = True
+        try:
+            for _ in range(args.repeat):
+                out_dir = workdir / 'out'
+                shutil.rmtree(out_dir, ignore_errors=True)
+                out_dir.mkdir()
+                start = time.perf_counter()
+                info = downloader._download_file(url, out_dir / 'blob.bin', None, out_dir / 'partial',
+                                                 args.segments)
+                best = min(best, time.perf_counter() - start)
+                if info is None or info['sha256'] != digest.hexdigest():
+                    ok = False
+        finally:
+            server.shutdown()
+
+    size = args.size_mb * 1024 * 1024
+    print(f'{args.size_mb} MB，segments={args.segments}，最短 {best:.3f}s，{size / best / 1e6:.0f} MB/s')
+    if not ok:
+        print('下载结果与源文件不一致', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,26 +11,991 @@
 
 返回：
 - 下载后的文件夹路径。空字符串表示下载失败。
+
+批量下载：
+- python3 downloader.py --manifest <清单文件|-> [tmp_root] [--jobs N]
+- 清单每行一个 URL，或一个 JSON 对象 {"url": "...", "sha256": "..."}，并发下载后每个 URL 输出一行 JSON 结果
+
+耗时追踪：
+- --trace <文件|-> 或环境变量 DOWNLOADER_TRACE 开启后，每个阶段（connect、tls、ttfb、transfer、extract、git_fetch 等）
+  结束时输出一行 JSON，- 表示 stderr；批量下载结束时再输出一行 span 为 summary 的汇总
+
+校验：
+- 普通文件边下载边计算 SHA-256，结果中的 manifest 记录大小、SHA-256、耗时和吞吐量
+- --sha256 <摘要> 或清单中的 sha256 指定期望值，不一致时视为下载失败；缓存中已有相同内容时不发起请求
+
+分段下载：
+- 加上 --segments N 后，对支持 Range 请求的大文件分 N 段并发下载
+
+选择性解压：
+- 加上 --include <glob>（可重复）后，压缩包只解压匹配的文件，例如 --include "*.h" --include "libs/**"
+
+GitHub 仓库：
+- 仓库缓存在用户缓存目录（$XDG_CACHE_HOME 或 ~/.cache）的 zego-resource-downloader/git_mirrors 中，重复下载同一仓库时只增量获取
+- --ref <分支|标签|提交> 指定版本，--path <路径>（可重复）只导出仓库中的部分目录或文件
+- --github-mode archive 直接下载 codeload 的 tar.gz 快照并边下载边解压，私有仓库等情况下自动改用 git
 """
 
 import os
+import re
 import sys
+import json
+import time
+import io
+import errno
 import uuid
+import hashlib
+import sqlite3
+import struct
 import shutil
 import zipfile
 import tarfile
+import tempfile
+import threading
 import subprocess
+import importlib.util
 from pathlib import Path
-from urllib.parse import urlparse, unquote
+from typing import Callable, NamedTuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, unquote, quote
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import ProtocolError, ReadTimeoutError, SSLError
+    from urllib3.util.retry import Retry
 except ImportError:
     print("错误: 需要安装 requests 库")
     print("请运行: pip install requests")
     sys.exit(1)
 
 
+# 批量下载时的默认并发数
+DEFAULT_JOBS = 4
+
+# 连接池与重试配置，可通过环境变量覆盖
+# 每个主机保持的最大连接数，满了之后等待空闲连接而不是新建连接；
+# 没有设置 DOWNLOADER_POOL_SIZE 时，会按并发数和分段数自动扩大（见 _ensure_pool_size）
+POOL_SIZE = int(os.environ.get("DOWNLOADER_POOL_SIZE", DEFAULT_JOBS))
+# 连接失败、读取失败或服务端返回 429/5xx 时的最大重试次数
+MAX_RETRIES = int(os.environ.get("DOWNLOADER_RETRIES", 3))
+# 重试退避系数，第 n 次重试前等待 backoff * 2^(n-1) 秒
+RETRY_BACKOFF = float(os.environ.get("DOWNLOADER_BACKOFF", 0.5))
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+# 耗时追踪：每个阶段结束时输出一行 JSON，DOWNLOADER_TRACE 设为 - 时写到 stderr，其他值视为文件路径
+_trace_output = None
+_trace_lock = threading.Lock()
+_trace_local = threading.local()
+# 按阶段名汇总的 {"count", "duration", "bytes"}，批量下载结束时输出
+_trace_totals: dict[str, dict] = {}
+
+
+def set_trace_output(target: str | None):
+    """
+    设置耗时追踪的输出位置
+
+    Args:
+        target: - 表示 stderr，其他值视为文件路径（追加写入）；None 或空字符串时关闭追踪
+    """
+    global _trace_output
+    with _trace_lock:
+        if _trace_output is not None and _trace_output is not sys.stderr:
+            _trace_output.close()
+        if not target:
+            _trace_output = None
+        elif target == '-':
+            _trace_output = sys.stderr
+        else:
+            _trace_output = open(target, 'a', encoding='utf-8', buffering=1)
+
+
+def _trace_emit(record: dict):
+    """输出一条追踪记录，并计入汇总"""
+    with _trace_lock:
+        if _trace_output is None:
+            return
+        _trace_output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        total = _trace_totals.setdefault(record["span"], {"count": 0, "duration": 0.0, "bytes": 0})
+        total["count"] += 1
+        total["duration"] += record["duration"]
+        total["bytes"] += record.get("bytes") or 0
+
+
+def _trace_stack() -> list:
+    """当前线程正在进行的阶段 id 栈"""
+    if not hasattr(_trace_local, "stack"):
+        _trace_local.stack = []
+    return _trace_local.stack
+
+
+@contextmanager
+def _span(name: str, **fields):
+    """
+    记录一个阶段的耗时
+
+    yield 出的 dict 可以在阶段内补充字段（例如 bytes），阶段结束时一并输出；
+    阶段内抛出异常时 status 为 error，也可以在 dict 中直接设置 status。未开启追踪时不做任何记录
+
+    Args:
+        name: 阶段名
+        **fields: 附加字段，例如 url
+    """
+    if _trace_output is None:
+        yield fields
+        return
+
+    stack = _trace_stack()
+    span_id = uuid.uuid4().hex[:8]
+    parent = stack[-1] if stack else None
+    start = time.time()
+    started = time.perf_counter()
+    stack.append(span_id)
+    status = "ok"
+    try:
+        yield fields
+    except BaseException as e:
+        status = "error"
+        fields.setdefault("error", str(e))
+        raise
+    finally:
+        stack.pop()
+        _trace_emit({"span": name, "id": span_id, "parent": parent, "start": round(start, 6),
+                     "duration": round(time.perf_counter() - started, 6), "status": status, **fields})
+
+
+def _trace_event(name: str, duration: float, **fields):
+    """记录一个已经结束的阶段（耗时由调用方测量），父阶段为当前线程正在进行的阶段"""
+    if _trace_output is None:
+        return
+    stack = _trace_stack()
+    _trace_emit({"span": name, "id": uuid.uuid4().hex[:8], "parent": stack[-1] if stack else None,
+                 "start": round(time.time() - duration, 6), "duration": round(duration, 6),
+                 "status": "ok", **fields})
+
+
+def _trace_summary(results: list[dict], duration: float):
+    """批量下载结束时输出汇总记录：总耗时、总字节数、吞吐量以及各阶段的次数、耗时和字节数"""
+    with _trace_lock:
+        if _trace_output is None:
+            return
+        phases = {name: {**total, "duration": round(total["duration"], 6)} for name, total in _trace_totals.items()}
+        total_bytes = _trace_totals.get("download", {}).get("bytes", 0)
+        record = {
+            "span": "summary",
+            "urls": len(results),
+            "failed": sum(1 for item in results if _is_failed(item["path"])),
+            "duration": round(duration, 6),
+            "bytes": total_bytes,
+            # 字节/秒
+            "throughput": round(total_bytes / duration) if duration > 0 else None,
+            "phases": phases,
+        }
+        _trace_output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _bind_span(fn: Callable) -> Callable:
+    """让 fn 在线程池中执行时，以调用 _bind_span 时正在进行的阶段作为父阶段"""
+    parent = list(_trace_stack()[-1:])
+
+    def run(*args, **kwargs):
+        stack = _trace_stack()
+        saved = stack[:]
+        stack[:] = parent
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stack[:] = saved
+    return run
+
+
+class _TracedHTTPConnection(HTTPConnection):
+    """记录建立 TCP 连接的耗时（含 DNS 解析，二者在 urllib3 内部同一步完成）"""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        sock = super()._new_conn()
+        _trace_event("connect", time.perf_counter() - started, host=self.host)
+        return sock
+
+
+class _TracedHTTPSConnection(HTTPSConnection):
+    """记录建立 TCP 连接和 TLS 握手的耗时"""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        sock = super()._new_conn()
+        self._connected_at = time.perf_counter()
+        _trace_event("connect", self._connected_at - started, host=self.host)
+        return sock
+
+    def connect(self):
+        super().connect()
+        _trace_event("tls", time.perf_counter() - self._connected_at, host=self.host)
+
+
+class _TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TracedHTTPConnection
+
+
+class _TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TracedHTTPSConnection
+
+
+class _TracedHTTPAdapter(HTTPAdapter):
+    """新建连接时记录 connect / tls 阶段的 HTTPAdapter"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TracedHTTPConnectionPool,
+            "https": _TracedHTTPSConnectionPool,
+        }
+
+
+def _trace_response(response, *args, **kwargs):
+    """记录从发出请求到收到响应头的耗时（首字节时间）"""
+    _trace_event("ttfb", response.elapsed.total_seconds(), url=response.url, status_code=response.status_code)
+
+
+if os.environ.get("DOWNLOADER_TRACE"):
+    set_trace_output(os.environ["DOWNLOADER_TRACE"])
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+# 当前连接池大小，只会扩大
+_pool_size = POOL_SIZE
+
+
+def _new_adapter() -> HTTPAdapter:
+    """创建带退避重试策略、按 _pool_size 限制每个主机连接数的适配器"""
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    return _TracedHTTPAdapter(pool_connections=_pool_size, pool_maxsize=_pool_size,
+                              max_retries=retry, pool_block=True)
+
+
+def _get_session() -> requests.Session:
+    """
+    获取进程内共享的 HTTP 会话
+
+    同一主机的请求复用 keep-alive 连接，避免每次下载重新进行 TCP 和 TLS 握手；
+    挂载带退避的重试策略，并按主机限制连接数
+
+    Returns:
+        共享的 requests.Session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = _new_adapter()
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.hooks["response"].append(_trace_response)
+                _session = session
+    return _session
+
+
+def _ensure_pool_size(connections: int):
+    """
+    确保每个主机的连接池至少能容纳 connections 个并发连接
+
+    连接池满时请求会等待空闲连接，池比并发数小时并发下载和分段下载会悄悄退化为串行。
+    设置了 DOWNLOADER_POOL_SIZE 时以其为准，只输出警告
+
+    Args:
+        connections: 同一主机可能同时使用的连接数（并发数 × 分段数）
+    """
+    global _pool_size
+    with _session_lock:
+        if connections <= _pool_size:
+            return
+        if "DOWNLOADER_POOL_SIZE" in os.environ:
+            print(f"警告: DOWNLOADER_POOL_SIZE={_pool_size} 小于并发连接数 {connections}，"
+                  "部分请求会等待空闲连接", file=sys.stderr)
+            return
+        _pool_size = connections
+        if _session is not None:
+            # 已有的适配器仍可能被进行中的请求使用，不关闭，新请求使用新的适配器
+            adapter = _new_adapter()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+
+
+# 下载缓存等持久化数据保存在用户缓存目录（$XDG_CACHE_HOME 或 ~/.cache）下的这个目录中，
+# 不放在 workspace 里，避免弄乱用户项目或被误提交
+USER_CACHE_DIR_NAME = "zego-resource-downloader"
+
+# 下载缓存配置
+# DOWNLOADER_CACHE 指定缓存目录，设为 off/0/false 时禁用缓存
+CACHE_DIR_NAME = "download_cache"
+# 缓存总大小上限（MB），超出后按最近最少使用的顺序淘汰
+CACHE_MAX_BYTES = int(os.environ.get("DOWNLOADER_CACHE_MAX_MB", 2048)) * 1024 * 1024
+# Linux 上的 FICLONE ioctl，用于在支持的文件系统（btrfs、xfs 等）上创建 reflink
+_FICLONE = 0x40049409
+
+
+def _get_user_cache_root() -> Path:
+    """获取用户缓存目录下本工具使用的目录（$XDG_CACHE_HOME/zego-resource-downloader 或 ~/.cache/zego-resource-downloader）"""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / USER_CACHE_DIR_NAME
+
+
+def _get_cache_dir() -> Path | None:
+    """
+    获取下载缓存目录
+
+    Returns:
+        缓存目录路径，禁用缓存时返回 None
+    """
+    cache_dir = os.environ.get("DOWNLOADER_CACHE")
+    if cache_dir:
+        if cache_dir.lower() in ("off", "0", "false"):
+            return None
+        return Path(cache_dir).expanduser().resolve()
+    return _get_user_cache_root() / CACHE_DIR_NAME
+
+
+@contextmanager
+def _open_cache(cache_dir: Path):
+    """
+    打开缓存索引数据库，退出时提交并关闭连接
+
+    缓存内容按 SHA-256 存放在 objects/ 下，索引记录每个 URL 对应的内容摘要和校验信息（ETag、Last-Modified）
+
+    Args:
+        cache_dir: 缓存目录
+
+    Yields:
+        数据库连接
+    """
+    (cache_dir / "objects").mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(cache_dir / "index.sqlite3"), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS entries ("
+        "url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, "
+        "etag TEXT, last_modified TEXT, last_used REAL NOT NULL)"
+    )
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _cache_lookup(cache_dir: Path, url: str) -> dict | None:
+    """
+    查找 URL 对应的缓存记录
+
+    Args:
+        cache_dir: 缓存目录
+        url: 资源 URL
+
+    Returns:
+        {"digest", "size", "etag", "last_modified", "blob"}，没有缓存或缓存文件已丢失时返回 None
+    """
+    with _open_cache(cache_dir) as conn:
+        row = conn.execute(
+            "SELECT digest, size, etag, last_modified FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+    if row is None:
+        return None
+
+    blob = cache_dir / "objects" / row[0]
+    if not blob.exists():
+        return None
+    return {"digest": row[0], "size": row[1], "etag": row[2], "last_modified": row[3], "blob": blob}
+
+
+def _cache_touch(cache_dir: Path, url: str):
+    """更新缓存记录的最近使用时间"""
+    with _open_cache(cache_dir) as conn:
+        conn.execute("UPDATE entries SET last_used = ? WHERE url = ?", (time.time(), url))
+
+
+class _IntegrityError(Exception):
+    """下载内容的 SHA-256 与期望值不一致"""
+
+
+def _sha256_file(file_path: Path):
+    """
+    计算文件的 SHA-256
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        hashlib 的 sha256 对象，可以继续 update
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest
+
+
+def _cache_store(cache_dir: Path, url: str, file_path: Path, validators: dict, target_path: Path | None) -> bool:
+    """
+    将下载完成的文件写入缓存，并链接到目标路径
+
+    以 SHA-256 为文件名放入 objects/，相同内容只保存一份
+
+    Args:
+        cache_dir: 缓存目录
+        url: 资源 URL
+        file_path: 下载完成的文件，写入缓存后会被移走
+        validators: 响应的校验信息 {"etag": ..., "last_modified": ..., "sha256": ...}，
+            没有 sha256 时重新读取文件计算
+        target_path: 目标文件路径，为 None 时只写入缓存
+
+    Returns:
+        是否写入成功
+    """
+    sha256 = validators.get("sha256") or _sha256_file(file_path).hexdigest()
+    size = file_path.stat().st_size
+
+    blob = cache_dir / "objects" / sha256
+    (cache_dir / "objects").mkdir(parents=True, exist_ok=True)
+    if blob.exists():
+        file_path.unlink()
+    else:
+        # 缓存文件设为只读，避免被意外修改
+        file_path.chmod(0o444)
+        shutil.move(str(file_path), str(blob))
+
+    with _open_cache(cache_dir) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (url, digest, size, etag, last_modified, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, blob.name, size, validators.get("etag"), validators.get("last_modified"), time.time()),
+        )
+    if target_path is not None:
+        _reflink_or_copy(blob, target_path)
+    _evict_cache(cache_dir)
+    return True
+
+
+def _reflink_or_copy(source: Path, target: Path):
+    """
+    将缓存文件放到目标路径：优先 reflink（写时复制），不支持时复制
+
+    不使用硬链接：目标文件与缓存共用同一份数据，之后就地修改目标文件会破坏缓存
+
+    Args:
+        source: 缓存文件路径
+        target: 目标文件路径
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            import fcntl
+            with open(source, 'rb') as src, open(target, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return
+        except OSError:
+            if target.exists():
+                target.unlink()
+
+    shutil.copyfile(source, target)
+
+
+def _evict_cache(cache_dir: Path, max_bytes: int = CACHE_MAX_BYTES):
+    """
+    缓存总大小超过上限时，按最近使用时间从旧到新淘汰记录，并删除不再被引用的缓存文件
+
+    Args:
+        cache_dir: 缓存目录
+        max_bytes: 缓存总大小上限
+    """
+    with _open_cache(cache_dir) as conn:
+        rows = conn.execute(
+            "SELECT digest, MAX(size), MAX(last_used) AS used FROM entries GROUP BY digest ORDER BY used"
+        ).fetchall()
+        total = sum(row[1] for row in rows)
+        evicted = []
+        for digest, size, _ in rows:
+            if total <= max_bytes:
+                break
+            evicted.append(digest)
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE digest = ?", [(digest,) for digest in evicted])
+
+    for digest in evicted:
+        blob = cache_dir / "objects" / digest
+        if blob.exists():
+            blob.unlink()
+
+
+# 未完成的下载保存在用户缓存目录下的这个目录中，下次下载同一 URL 时断点续传
+PARTIAL_DIR_NAME = "partial"
+# 断点续传时可恢复的网络错误
+_RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+_partial_locks: dict[str, threading.Lock] = {}
+_partial_locks_guard = threading.Lock()
+
+# 传输配置：每次读取的字节数在最小值和最大值之间自适应调整，
+# 使一次读取大约耗时 TRANSFER_TARGET_SECONDS，快速网络上用大块减少循环和 write 次数，慢速网络上用小块尽快落盘
+TRANSFER_MIN_CHUNK = 64 * 1024
+TRANSFER_MAX_CHUNK = max(TRANSFER_MIN_CHUNK, int(float(os.environ.get("DOWNLOADER_CHUNK_MB", 4)) * 1024 * 1024))
+TRANSFER_TARGET_SECONDS = 0.25
+# Linux fallocate 的 FALLOC_FL_KEEP_SIZE：预留磁盘空间但不改变文件大小
+_FALLOC_FL_KEEP_SIZE = 0x01
+
+
+def _read_response(response, write: Callable[[memoryview], None]) -> int:
+    """
+    将响应体读入可复用的缓冲区，再交给 write 写出，减少 Python 层的循环次数和临时对象
+
+    urllib3 的 readinto 内部通过 read() 读取，每个数据块仍会复制一次，并不是零拷贝
+
+    每次读取的大小在 TRANSFER_MIN_CHUNK 和 TRANSFER_MAX_CHUNK 之间自适应：读取耗时低于目标值时加倍，
+    高于目标值的 4 倍时减半。响应有 Content-Encoding 时需要解码，改用 iter_content
+
+    Args:
+        response: stream=True 的响应
+        write: 接收数据块的函数，参数在下一次读取前有效
+
+    Returns:
+        读取的字节数
+
+    Raises:
+        requests.exceptions.ChunkedEncodingError: 连接中断或数据不完整
+        requests.exceptions.ConnectionError: 读取超时或 TLS 错误
+    """
+    total = 0
+    if response.headers.get("Content-Encoding", "identity").lower() != "identity":
+        for chunk in response.iter_content(chunk_size=TRANSFER_MIN_CHUNK):
+            if chunk:
+                write(memoryview(chunk))
+                total += len(chunk)
+        return total
+
+    buffer = memoryview(bytearray(TRANSFER_MAX_CHUNK))
+    size = TRANSFER_MIN_CHUNK
+    try:
+        while True:
+            started = time.perf_counter()
+            count = response.raw.readinto(buffer[:size])
+            if not count:
+                return total
+            elapsed = time.perf_counter() - started
+            write(buffer[:count])
+            total += count
+            if elapsed < TRANSFER_TARGET_SECONDS and size < TRANSFER_MAX_CHUNK:
+                size = min(size * 2, TRANSFER_MAX_CHUNK)
+            elif elapsed > TRANSFER_TARGET_SECONDS * 4 and size > TRANSFER_MIN_CHUNK:
+                size //= 2
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e)
+    except SSLError as e:
+        raise requests.exceptions.SSLError(e)
+
+
+def _write_all(fd: int, data: memoryview, offset: int | None = None):
+    """
+    写出全部数据；write/pwrite 可能只写入一部分（磁盘将满、NFS、被信号中断等），需要循环写完
+
+    Args:
+        fd: 文件描述符
+        data: 要写入的数据
+        offset: 写入位置，为 None 时写到文件当前位置
+
+    Raises:
+        OSError: 写入失败
+    """
+    while data:
+        written = os.write(fd, data) if offset is None else os.pwrite(fd, data, offset)
+        if written <= 0:
+            raise OSError(errno.EIO, "写入文件失败")
+        data = data[written:]
+        if offset is not None:
+            offset += written
+
+
+def _reserve_space(fd: int, offset: int, length: int):
+    """
+    为即将写入的数据预留磁盘空间，减少文件碎片，磁盘空间不足时提前失败
+
+    使用 FALLOC_FL_KEEP_SIZE，文件大小不变，断点续传仍以文件大小作为已下载的字节数。
+    非 Linux 系统或文件系统不支持时不做任何事
+
+    Raises:
+        OSError: 磁盘空间不足
+    """
+    if length <= 0 or not sys.platform.startswith('linux'):
+        return
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        # fallocate64 的偏移参数固定为 64 位；fallocate 的 off_t 在 32 位系统上可能只有 32 位，
+        # 只在 long 为 64 位（off_t 也为 64 位）时才使用
+        fallocate = getattr(libc, 'fallocate64', None)
+        if fallocate is None:
+            if ctypes.sizeof(ctypes.c_long) != 8:
+                return
+            fallocate = libc.fallocate
+        fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+        fallocate.restype = ctypes.c_int
+        result = fallocate(fd, _FALLOC_FL_KEEP_SIZE, offset, length)
+    except (OSError, AttributeError):
+        return
+    if result != 0 and ctypes.get_errno() == errno.ENOSPC:
+        raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+
+def _get_partial_dir() -> Path:
+    """获取保存未完成下载的目录（用户缓存目录下，与下载缓存放在一起）"""
+    return _get_user_cache_root() / PARTIAL_DIR_NAME
+
+
+@contextmanager
+def _partial_lock(url: str, partial_dir: Path):
+    """
+    锁定 URL 对应的未完成下载，同一 URL 的 .part 文件和进度记录同时只有一个下载在读写
+
+    进程内用线程锁，进程间在支持时对旁边的 .lock 文件加文件锁（进度记录会被重写和删除，不适合直接加锁）
+
+    Args:
+        url: 资源 URL
+        partial_dir: 保存未完成下载的目录
+
+    Yields:
+        未完成下载的文件名前缀
+    """
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+    with _partial_locks_guard:
+        lock = _partial_locks.setdefault(key, threading.Lock())
+    with lock:
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            import fcntl
+        except ImportError:
+            yield key
+            return
+        with open(partial_dir / f"{key}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield key
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_partial_meta(meta_path: Path, url: str) -> dict | None:
+    """
+    读取未完成下载的进度记录
+
+    只有记录了 ETag 或 Last-Modified 的下载才能跨进程续传，否则无法确认服务端文件没有变化
+
+    Args:
+        meta_path: 进度记录文件路径
+        url: 资源 URL
+
+    Returns:
+        进度记录，不存在或不可用时返回 None
+    """
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("url") != url or not (meta.get("etag") or meta.get("last_modified")):
+        return None
+    return meta
+
+
+def _fetch_resumable(url: str, headers: dict, partial_dir: Path) -> tuple[Path, dict] | None:
+    """
+    使用 HTTP Range 请求断点续传下载文件
+
+    数据写入 partial_dir 下的 .part 文件，旁边的 .json 文件记录 URL、校验信息和总大小。
+    下载中断时按退避策略自动重试，从 .part 已有的长度继续；重试用尽后保留 .part，
+    下次下载同一 URL 时通过 If-Range 确认文件未变化后继续下载
+
+    Args:
+        url: 文件 URL
+        headers: 请求头，可以包含 If-None-Match / If-Modified-Since 条件请求头
+        partial_dir: 保存未完成下载的目录
+
+    Returns:
+        (下载完成的文件路径, {"etag", "last_modified", "sha256", "size"})；条件请求返回 304 时返回 None
+        sha256 在写入数据的同时增量计算，跨进程续传时先对已下载的部分计算一次
+    """
+    with _partial_lock(url, partial_dir) as key:
+        part_path = partial_dir / f"{key}.part"
+        meta_path = partial_dir / f"{key}.json"
+
+        meta = _read_partial_meta(meta_path, url) if part_path.exists() else None
+        if meta is not None and "segments" in meta:
+            # 分段下载留下的文件已经预分配到完整大小，不能按文件长度续传
+            meta = None
+        # 与 .part 当前内容对应的 SHA-256
+        digest = None
+        attempt = 0
+        while True:
+            offset = part_path.stat().st_size if meta is not None and part_path.exists() else 0
+            request_headers = dict(headers)
+            if offset:
+                # 续传时不再发送条件请求头，改用 If-Range 保证服务端文件没有变化
+                request_headers.pop('If-None-Match', None)
+                request_headers.pop('If-Modified-Since', None)
+                request_headers['Range'] = f'bytes={offset}-'
+                validator = meta.get("etag") or meta.get("last_modified")
+                if validator:
+                    request_headers['If-Range'] = validator
+
+            try:
+                with _get_session().get(url, headers=request_headers, stream=True, timeout=30) as response:
+                    if response.status_code == 304 and not offset:
+                        return None
+                    if response.status_code == 416 and offset and offset == meta.get("total"):
+                        # 上次已经下载完整，只是没来得及完成
+                        break
+                    response.raise_for_status()
+
+                    content_range = response.headers.get("Content-Range", "")
+                    if response.status_code == 206 and content_range.startswith(f"bytes {offset}-"):
+                        mode = 'ab'
+                        if digest is None:
+                            digest = _sha256_file(part_path)
+                    else:
+                        # 服务端不支持 Range 或文件已变化，从头下载
+                        mode = 'wb'
+                        total = response.headers.get("Content-Length")
+                        meta = {
+                            "url": url,
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                            "total": int(total) if total and not response.headers.get("Content-Encoding") else None,
+                        }
+                        with open(meta_path, 'w', encoding='utf-8') as f:
+                            json.dump(meta, f)
+                        digest = hashlib.sha256()
+
+                    with _span("transfer", url=url, offset=offset if mode == 'ab' else 0) as span, \
+                            open(part_path, mode, buffering=0) as f:
+                        written = f.seek(0, os.SEEK_END)
+                        length = response.headers.get("Content-Length")
+                        if length and not response.headers.get("Content-Encoding"):
+                            _reserve_space(f.fileno(), written, int(length))
+
+                        def write(chunk: memoryview):
+                            _write_all(f.fileno(), chunk)
+                            digest.update(chunk)
+                        try:
+                            _read_response(response, write)
+                        finally:
+                            span["bytes"] = f.tell() - written
+                break
+
+            except _RESUMABLE_ERRORS:
+                attempt += 1
+                if attempt > MAX_RETRIES or meta is None:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+        if meta.get("total") is not None and part_path.stat().st_size != meta["total"]:
+            raise requests.exceptions.ChunkedEncodingError(
+                f"下载不完整: {part_path.stat().st_size}/{meta['total']} 字节"
+            )
+
+        if digest is None:
+            # 上次已经下载完整（416），对已有文件计算一次
+            digest = _sha256_file(part_path)
+
+        # 下载完成后换成唯一的文件名，避免与之后同一 URL 的下载冲突
+        done_path = partial_dir / f"{key}.{uuid.uuid4().hex[:8]}.done"
+        os.replace(part_path, done_path)
+        meta_path.unlink()
+        return done_path, {
+            "etag": meta.get("etag"),
+            "last_modified": meta.get("last_modified"),
+            "sha256": digest.hexdigest(),
+            "size": done_path.stat().st_size,
+        }
+
+
+# 分段下载配置
+# 默认分段数，1 表示不分段；可通过 --segments 参数或环境变量 DOWNLOADER_SEGMENTS 覆盖
+DEFAULT_SEGMENTS = int(os.environ.get("DOWNLOADER_SEGMENTS", 1))
+# 每段的最小字节数，文件太小时减少分段数或不分段
+SEGMENT_MIN_SIZE = 8 * 1024 * 1024
+
+
+class _SegmentedFallback(Exception):
+    """服务端不支持 Range 请求，或文件在分段下载过程中发生了变化，需要改用单连接下载"""
+
+
+def _fetch_segment(url: str, headers: dict, fd: int, segment: list, validator: str | None):
+    """
+    下载一个分段，通过 pwrite 写入预分配文件的对应位置
+
+    Args:
+        url: 文件 URL
+        headers: 请求头
+        fd: 预分配文件的文件描述符
+        segment: [起始位置, 结束位置（含）, 已下载字节数]，下载过程中会更新已下载字节数
+        validator: 用于 If-Range 的 ETag 或 Last-Modified
+    """
+    attempt = 0
+    while True:
+        start, end, done = segment
+        if start + done > end:
+            return
+
+        request_headers = dict(headers)
+        request_headers['Range'] = f'bytes={start + done}-{end}'
+        if validator:
+            request_headers['If-Range'] = validator
+
+        try:
+            with _span("segment", url=url, range=request_headers['Range']) as span, \
+                    _get_session().get(url, headers=request_headers, stream=True, timeout=30) as response:
+                content_range = response.headers.get("Content-Range", "")
+                if response.status_code != 206 or not content_range.startswith(f"bytes {start + done}-"):
+                    raise _SegmentedFallback(f"分段请求返回 {response.status_code}")
+
+                def write(chunk: memoryview):
+                    _write_all(fd, chunk, start + segment[2])
+                    segment[2] += len(chunk)
+                try:
+                    _read_response(response, write)
+                finally:
+                    span["bytes"] = segment[2] - done
+
+            if start + segment[2] <= end:
+                raise requests.exceptions.ChunkedEncodingError("分段数据不完整")
+            return
+
+        except _RESUMABLE_ERRORS:
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+
+def _fetch_segmented(url: str, headers: dict, partial_dir: Path, segments: int) -> tuple[Path, dict] | None:
+    """
+    将文件分成多个 Range 并发下载到预分配的 .part 文件中
+
+    .json 进度记录中保存每段的下载进度，中断后再次下载同一 URL 时继续未完成的分段。
+    服务端不支持 Range、文件太小或下载过程中文件发生变化时抛出 _SegmentedFallback
+
+    Args:
+        url: 文件 URL
+        headers: 请求头，可以包含 If-None-Match / If-Modified-Since 条件请求头
+        partial_dir: 保存未完成下载的目录
+        segments: 最大分段数
+
+    Returns:
+        同 _fetch_resumable
+    """
+    with _partial_lock(url, partial_dir) as key:
+        part_path = partial_dir / f"{key}.part"
+        meta_path = partial_dir / f"{key}.json"
+
+        meta = _read_partial_meta(meta_path, url) if part_path.exists() else None
+        if meta is not None and "segments" not in meta:
+            # 已有单连接下载的进度，交给单连接续传
+            raise _SegmentedFallback("存在单连接下载的进度")
+
+        if meta is None:
+            # 用 1 字节的 Range 请求确认服务端支持分段，并获取文件总大小
+            probe_headers = dict(headers)
+            probe_headers['Range'] = 'bytes=0-0'
+            with _get_session().get(url, headers=probe_headers, stream=True, timeout=30) as response:
+                if response.status_code == 304 and ('If-None-Match' in headers or 'If-Modified-Since' in headers):
+                    return None
+                match = re.match(r'bytes 0-0/(\d+)$', response.headers.get("Content-Range", ""))
+                if response.status_code != 206 or not match:
+                    raise _SegmentedFallback("服务端不支持 Range 请求")
+                total = int(match.group(1))
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+            count = min(segments, total // SEGMENT_MIN_SIZE)
+            if count < 2:
+                raise _SegmentedFallback("文件太小，不需要分段")
+            size = -(-total // count)
+            meta = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "total": total,
+                "segments": [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)],
+            }
+            with open(part_path, 'wb') as f:
+                f.truncate(total)
+                # 各段乱序写入，一次性为整个文件分配磁盘空间；不支持时保留稀疏文件
+                if hasattr(os, 'posix_fallocate'):
+                    try:
+                        os.posix_fallocate(f.fileno(), 0, total)
+                    except OSError as e:
+                        if e.errno == errno.ENOSPC:
+                            raise
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+        # 分段请求不带条件请求头，改用 If-Range 保证各段来自同一版本的文件
+        segment_headers = {k: v for k, v in headers.items() if k not in ('If-None-Match', 'If-Modified-Since')}
+        validator = meta.get("etag") or meta.get("last_modified")
+        fd = os.open(part_path, os.O_WRONLY)
+        completed = False
+        try:
+            with ThreadPoolExecutor(max_workers=len(meta["segments"])) as executor:
+                futures = [
+                    executor.submit(_bind_span(_fetch_segment), url, segment_headers, fd, segment, validator)
+                    for segment in meta["segments"]
+                ]
+                for future in futures:
+                    future.result()
+            completed = True
+        except _SegmentedFallback:
+            # 文件已变化，丢弃已下载的分段
+            os.close(fd)
+            fd = None
+            part_path.unlink()
+            meta_path.unlink()
+            raise
+        finally:
+            if fd is not None:
+                os.close(fd)
+            if not completed and meta_path.exists():
+                # 保存各段进度，供下次续传
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(meta, f)
+
+        done_path = partial_dir / f"{key}.{uuid.uuid4().hex[:8]}.done"
+        os.replace(part_path, done_path)
+        meta_path.unlink()
+        # 各段乱序写入，只能在全部完成后计算 SHA-256
+        with _span("hash", bytes=meta["total"]):
+            sha256 = _sha256_file(done_path).hexdigest()
+        return done_path, {
+            "etag": meta.get("etag"),
+            "last_modified": meta.get("last_modified"),
+            "sha256": sha256,
+            "size": meta["total"],
+        }
+
+
 def _get_workspace_root() -> Path:
     """
     获取 workspace 根目录
@@ -116,77 +1081,699 @@ def _is_archive(filename: str) -> bool:
     return any(filename_lower.endswith(ext) for ext in archive_extensions)
 
 
-def _extract_archive(archive_path: Path, extract_to: Path) -> bool:
+# 解压配置
+# 解压 zip 的线程数，zlib 解压时会释放 GIL，多线程可以并行解压不同的文件；
+# 只有一个可用 CPU 时多线程反而更慢（见 bench_extract_zip.py），因此默认值按进程可用的 CPU 数计算
+_USABLE_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+EXTRACT_JOBS = int(os.environ.get("DOWNLOADER_EXTRACT_JOBS", min(8, _USABLE_CPUS)))
+# 解压时复制数据的缓冲区大小
+COPY_BUFFER_SIZE = 1024 * 1024
+# zip 本地文件头的结构，第 10、11 个字段为文件名和扩展字段的长度
+_ZIP_LOCAL_HEADER = struct.Struct(zipfile.structFileHeader)
+
+
+def _zip_member_path(extract_to: Path, member: zipfile.ZipInfo) -> Path:
+    """
+    计算 zip 成员的解压路径，与 ZipFile.extract 相同地去掉盘符、绝对路径和 ..，防止写到解压目录之外
+
+    Args:
+        extract_to: 解压目标目录
+        member: zip 成员
+
+    Returns:
+        解压路径
+    """
+    arcname = member.filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    parts = [part for part in arcname.split(os.path.sep) if part not in ('', os.path.curdir, os.path.pardir)]
+    return extract_to.joinpath(*parts) if parts else extract_to
+
+
+def _copy_stored_member(zip_fd: int, member: zipfile.ZipInfo, target: Path) -> bool:
+    """
+    对未压缩（ZIP_STORED）的成员，用 copy_file_range 在内核中直接从 zip 文件复制到目标文件
+
+    Args:
+        zip_fd: zip 文件的文件描述符
+        member: zip 成员
+        target: 目标文件路径
+
+    Returns:
+        是否复制成功；不支持时返回 False，由调用方改用普通方式解压
+    """
+    if member.compress_type != zipfile.ZIP_STORED or member.flag_bits & 0x1 or not hasattr(os, 'copy_file_range'):
+        return False
+
+    header = os.pread(zip_fd, _ZIP_LOCAL_HEADER.size, member.header_offset)
+    if len(header) != _ZIP_LOCAL_HEADER.size or header[:4] != zipfile.stringFileHeader:
+        return False
+    fields = _ZIP_LOCAL_HEADER.unpack(header)
+    offset = member.header_offset + _ZIP_LOCAL_HEADER.size + fields[10] + fields[11]
+
+    try:
+        with open(target, 'wb') as f:
+            remaining = member.file_size
+            while remaining:
+                copied = os.copy_file_range(zip_fd, f.fileno(), remaining, offset)
+                if copied == 0:
+                    raise OSError("zip 文件数据不完整")
+                offset += copied
+                remaining -= copied
+        return True
+    except OSError:
+        # 跨文件系统等情况下内核不支持，删除写了一半的文件后改用普通方式
+        if target.exists():
+            target.unlink()
+        return False
+
+
+def _extract_zip(source, extract_to: Path, jobs: int = EXTRACT_JOBS, include: list[str] | None = None):
+    """
+    使用线程池并行解压 zip
+
+    先在主线程中创建全部目录，再由多个线程并行解压文件；
+    压缩的成员用大缓冲区复制，未压缩的成员在可能时用 copy_file_range 直接复制
+
+    Args:
+        source: zip 文件路径或可随机访问的文件对象
+        extract_to: 解压目标目录
+        jobs: 解压线程数
+        include: 只解压匹配这些 glob 模式的成员，为 None 时全部解压
+    """
+    matches = _include_filter(include)
+    with zipfile.ZipFile(source, 'r') as zip_ref:
+        members = zip_ref.infolist()
+        files = []
+        directories = {extract_to}
+        for member in members:
+            if not matches(member.filename):
+                continue
+            target = _zip_member_path(extract_to, member)
+            if member.is_dir():
+                directories.add(target)
+            else:
+                directories.add(target.parent)
+                files.append((member, target))
+        for directory in sorted(directories):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        zip_fd = None
+        if isinstance(source, (str, Path)) and hasattr(os, 'copy_file_range'):
+            zip_fd = os.open(source, os.O_RDONLY)
+
+        def extract_member(item: tuple[zipfile.ZipInfo, Path]):
+            member, target = item
+            if zip_fd is not None and _copy_stored_member(zip_fd, member, target):
+                return
+            # ZipFile 读取时对底层文件加锁，解压在锁外进行，多个线程可以共享同一个 ZipFile
+            with zip_ref.open(member) as f_in, open(target, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
+
+        try:
+            if jobs > 1 and len(files) > 1:
+                with ThreadPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+                    # list() 让任意一个成员的异常在这里抛出
+                    list(executor.map(extract_member, files))
+            else:
+                for item in files:
+                    extract_member(item)
+        finally:
+            if zip_fd is not None:
+                os.close(zip_fd)
+
+
+class _Extractor(NamedTuple):
+    """解压后端"""
+    name: str
+    extensions: tuple[str, ...]
+    # extract(source, extract_to, filename, include)，source 为压缩包路径，支持流式解压的后端也可以是字节流
+    extract: Callable
+    available: Callable[[], bool]
+    # 是否可以从只能顺序读取的字节流中解压
+    streaming: bool
+
+
+# 已注册的解压后端，同一格式有多个后端时按注册顺序优先
+_EXTRACTORS: list[_Extractor] = []
+
+
+def register_extractor(name: str, extensions: tuple[str, ...], available: Callable[[], bool] | None = None,
+                       streaming: bool = False):
+    """
+    注册解压后端的装饰器
+
+    Args:
+        name: 后端名称，没有可用后端时用于提示安装
+        extensions: 支持的扩展名（小写）
+        available: 检查后端是否可用（命令或 Python 包是否已安装），为 None 时视为始终可用
+        streaming: 是否可以从只能顺序读取的字节流中解压
+    """
+    def decorator(func):
+        _EXTRACTORS.append(_Extractor(name, extensions, func, available or (lambda: True), streaming))
+        return func
+    return decorator
+
+
+def _find_extractors(filename: str, streaming: bool = False) -> list[_Extractor]:
+    """
+    查找能解压该文件的后端，按最长匹配的扩展名选择（例如 .tar.gz 优先于 .gz）
+
+    Args:
+        filename: 压缩包文件名
+        streaming: 是否只返回支持流式解压的后端
+
+    Returns:
+        按优先级排列的后端列表
+    """
+    filename = filename.lower()
+    best_length = 0
+    found = []
+    for extractor in _EXTRACTORS:
+        if streaming and not extractor.streaming:
+            continue
+        length = max((len(ext) for ext in extractor.extensions if filename.endswith(ext)), default=0)
+        if length > best_length:
+            best_length, found = length, [extractor]
+        elif length and length == best_length:
+            found.append(extractor)
+    return found
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """
+    将 glob 模式转换为正则表达式
+
+    - * 和 ? 不匹配 /，** 匹配任意层级目录
+    - 模式可以从任意一级目录开始匹配（SDK 压缩包通常有一层顶级目录，libs/** 也能匹配 sdk/libs/ 下的文件）；
+      以 / 开头时只从压缩包根目录开始匹配
+    - 匹配到目录时包含目录下的全部内容（如 libs 等同于 libs/**）
+    """
+    pattern = pattern.replace('\\', '/')
+    regex = '' if pattern.startswith('/') else '(?:.*/)?'
+    pattern = pattern.strip('/')
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return regex + '(?:/.*)?'
+
+
+def _include_filter(include: list[str] | None) -> Callable[[str], bool]:
+    """
+    根据 glob 模式列表生成成员过滤函数
+
+    Args:
+        include: glob 模式列表，例如 ["*.h", "libs/**"]；为空时不过滤
+
+    Returns:
+        判断成员路径是否需要解压的函数
+    """
+    if not include:
+        return lambda name: True
+    include_re = re.compile('|'.join(f'(?:{_glob_to_regex(pattern)})' for pattern in include))
+
+    def matches(name: str) -> bool:
+        name = name.replace('\\', '/')
+        while name.startswith('./'):
+            name = name[2:]
+        return include_re.fullmatch(name.strip('/')) is not None
+    return matches
+
+
+def _is_path(source) -> bool:
+    """判断解压来源是文件路径还是文件对象"""
+    return isinstance(source, (str, Path))
+
+
+@register_extractor('zipfile', ('.zip',))
+def _extract_zip_archive(source, extract_to: Path, filename: str, include: list[str] | None):
+    """ZIP 文件"""
+    _extract_zip(source, extract_to, include=include)
+
+
+@register_extractor('tarfile', ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz'), streaming=True)
+def _extract_tar_archive(source, extract_to: Path, filename: str, include: list[str] | None):
+    """TAR 文件，来源为字节流时使用 r|* 流式模式，只顺序读取一遍"""
+    if _is_path(source):
+        tar_ref = tarfile.open(source, 'r:*')
+    else:
+        tar_ref = tarfile.open(fileobj=source, mode='r|*')
+    matches = _include_filter(include)
+    with tar_ref:
+        if hasattr(tarfile, 'data_filter'):
+            # data 过滤器拒绝绝对路径、.. 、指向解压目录之外的链接和设备文件，并去掉危险的权限位
+            tar_ref.extractall(extract_to, members=(member for member in tar_ref if matches(member.name)),
+                               filter='data')
+        else:
+            tar_ref.extractall(extract_to, members=(member for member in tar_ref
+                                                    if _is_safe_tar_member(member) and matches(member.name)))
+
+
+def _is_safe_tar_member(member: tarfile.TarInfo) -> bool:
+    """
+    没有 tarfile 的 data 过滤器时（Python 3.11.4 之前），检查成员不会写到解压目录之外
+
+    拒绝绝对路径或包含 .. 的成员、目标为绝对路径或包含 .. 的链接，以及设备文件等特殊文件
+
+    Args:
+        member: tar 成员
+
+    Returns:
+        是否可以解压
+    """
+    def is_safe_path(path: str) -> bool:
+        path = path.replace('\\', '/')
+        return not path.startswith('/') and not os.path.splitdrive(path)[0] and '..' not in path.split('/')
+
+    if not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+        return False
+    if not is_safe_path(member.name):
+        return False
+    if member.issym() or member.islnk():
+        return is_safe_path(member.linkname)
+    return True
+
+
+@register_extractor('gzip/bz2/lzma', ('.gz', '.bz2', '.xz'), streaming=True)
+def _extract_compressed_file(source, extract_to: Path, filename: str, include: list[str] | None):
+    """GZ、BZ2、XZ 单文件压缩（非 tar）"""
+    if filename.endswith('.gz'):
+        import gzip
+        opener, output_name = gzip.open, filename[:-3]
+    elif filename.endswith('.bz2'):
+        import bz2
+        opener, output_name = bz2.open, filename[:-4]
+    else:
+        import lzma
+        opener, output_name = lzma.open, filename[:-3]
+
+    if not _include_filter(include)(output_name):
+        return
+    with opener(source, 'rb') as f_in:
+        with open(extract_to / output_name, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
+
+
+def _find_7z_command() -> str | None:
+    """查找 7z 命令（7z、7zz 或 7za）"""
+    return shutil.which('7z') or shutil.which('7zz') or shutil.which('7za')
+
+
+def _run_archive_command(args: list[str], list_file_names: list[str] | None = None):
+    """
+    运行 7z / unrar 命令，失败时抛出异常
+
+    Args:
+        args: 命令参数，其中的 {list_file} 会被替换为成员列表文件
+        list_file_names: 需要解压的成员列表，写入临时列表文件传给命令
+    """
+    list_file = None
+    try:
+        if list_file_names is not None:
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+                f.write('\n'.join(list_file_names))
+                list_file = f.name
+            args = [arg.replace('{list_file}', list_file) for arg in args]
+        result = subprocess.run(args, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or result.stdout.strip() or f"退出码 {result.returncode}")
+        return result.stdout
+    finally:
+        if list_file:
+            os.unlink(list_file)
+
+
+@register_extractor('7z 命令', ('.7z',), available=lambda: _find_7z_command() is not None)
+def _extract_7z_command(source, extract_to: Path, filename: str, include: list[str] | None):
+    """7Z 文件，使用 7z 命令"""
+    command = _find_7z_command()
+    if not include:
+        _run_archive_command([command, 'x', f'-o{extract_to}', '-y', str(source)])
+        return
+
+    listing = _run_archive_command([command, 'l', '-ba', '-slt', str(source)])
+    matches = _include_filter(include)
+    names = [line[7:] for line in listing.splitlines() if line.startswith('Path = ') and matches(line[7:])]
+    if names:
+        _run_archive_command([command, 'x', f'-o{extract_to}', '-y', str(source), '@{list_file}'], names)
+
+
+@register_extractor('py7zr', ('.7z',), available=lambda: importlib.util.find_spec('py7zr') is not None)
+def _extract_7z_python(source, extract_to: Path, filename: str, include: list[str] | None):
+    """7Z 文件，没有 7z 命令时使用纯 Python 实现的 py7zr"""
+    import py7zr
+    with py7zr.SevenZipFile(source, 'r') as archive:
+        if include:
+            matches = _include_filter(include)
+            archive.extract(path=extract_to, targets=[name for name in archive.getnames() if matches(name)])
+        else:
+            archive.extractall(path=extract_to)
+
+
+@register_extractor('unrar 命令', ('.rar',), available=lambda: shutil.which('unrar') is not None)
+def _extract_rar_command(source, extract_to: Path, filename: str, include: list[str] | None):
+    """RAR 文件，使用 unrar 命令"""
+    # 解压目录需要以路径分隔符结尾，否则 unrar 会把它当作成员名
+    destination = str(extract_to) + os.sep
+    if not include:
+        _run_archive_command(['unrar', 'x', '-y', str(source), destination])
+        return
+
+    listing = _run_archive_command(['unrar', 'lb', str(source)])
+    matches = _include_filter(include)
+    names = [name for name in listing.splitlines() if name and matches(name)]
+    if names:
+        _run_archive_command(['unrar', 'x', '-y', str(source), '@{list_file}', destination], names)
+
+
+@register_extractor('rarfile', ('.rar',), available=lambda: importlib.util.find_spec('rarfile') is not None)
+def _extract_rar_python(source, extract_to: Path, filename: str, include: list[str] | None):
+    """RAR 文件，没有 unrar 命令时使用 rarfile（需要系统中有 unar 或 bsdtar 等任意一个解压工具）"""
+    import rarfile
+    with rarfile.RarFile(source) as archive:
+        if include:
+            matches = _include_filter(include)
+            archive.extractall(extract_to, members=[name for name in archive.namelist() if matches(name)])
+        else:
+            archive.extractall(extract_to)
+
+
+def _extract_archive(archive_path: Path, extract_to: Path, filename: str | None = None,
+                     include: list[str] | None = None) -> bool:
     """
     解压缩文件
 
+    按扩展名从已注册的解压后端中依次尝试可用的后端，一个后端失败时继续尝试下一个
+
     Args:
         archive_path: 压缩包路径
         extract_to: 解压目标目录
+        filename: 压缩包的原始文件名，用于判断格式。如果为 None，则使用 archive_path 的文件名
+        include: 只解压匹配这些 glob 模式的文件（例如 ["*.h", "libs/**"]），为 None 时全部解压
 
     Returns:
         是否解压成功
     """
-    try:
-        filename = archive_path.name.lower()
+    filename = (filename or archive_path.name).lower()
+    extractors = _find_extractors(filename)
+    if not extractors:
+        return False
 
-        # ZIP 文件
-        if filename.endswith('.zip'):
-            with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_to)
+    errors = []
+    unavailable = []
+    for extractor in extractors:
+        if not extractor.available():
+            unavailable.append(extractor.name)
+            continue
+        try:
+            with _span("extract", file=filename, backend=extractor.name):
+                extractor.extract(archive_path, extract_to, filename, include)
             return True
+        except Exception as e:
+            errors.append(f"{extractor.name}: {str(e)}")
 
-        # TAR 文件
-        elif any(filename.endswith(ext) for ext in ['.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz']):
-            with tarfile.open(archive_path, 'r:*') as tar_ref:
-                tar_ref.extractall(extract_to)
-            return True
+    if errors:
+        print(f"解压缩失败: {'；'.join(errors)}", file=sys.stderr)
+    else:
+        print(f"解压缩失败: 没有可用的解压工具，请安装以下任意一个: {', '.join(unavailable)}", file=sys.stderr)
+    return False
 
-        # GZ 文件（非 tar.gz）
-        elif filename.endswith('.gz') and not filename.endswith('.tar.gz'):
-            import gzip
-            output_file = extract_to / filename[:-3]
-            with gzip.open(archive_path, 'rb') as f_in:
-                with open(output_file, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            return True
 
-        # BZ2 文件（非 tar.bz2）
-        elif filename.endswith('.bz2') and not filename.endswith('.tar.bz2'):
-            import bz2
-            output_file = extract_to / filename[:-4]
-            with bz2.open(archive_path, 'rb') as f_in:
-                with open(output_file, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            return True
+# zip 需要可随机访问的文件，边下载边解压时先写入内存或临时文件
+# zip 在内存中缓冲的最大字节数，超过后转存到临时文件
+ZIP_SPOOL_MAX_SIZE = 64 * 1024 * 1024
+STREAM_READ_SIZE = 1024 * 1024
 
-        # XZ 文件（非 tar.xz）
-        elif filename.endswith('.xz') and not filename.endswith('.tar.xz'):
-            import lzma
-            output_file = extract_to / filename[:-3]
-            with lzma.open(archive_path, 'rb') as f_in:
-                with open(output_file, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            return True
 
-        # RAR 和 7Z 需要外部工具
-        elif filename.endswith('.rar'):
-            # 尝试使用 unrar
-            result = subprocess.run(['unrar', 'x', '-y', str(archive_path), str(extract_to)],
-                                    capture_output=True, text=True)
-            return result.returncode == 0
+def _is_streamable_archive(filename: str) -> bool:
+    """
+    判断压缩包是否可以边下载边解压
 
-        elif filename.endswith('.7z'):
-            # 尝试使用 7z
-            result = subprocess.run(['7z', 'x', f'-o{extract_to}', '-y', str(archive_path)],
-                                    capture_output=True, text=True)
-            return result.returncode == 0
+    Args:
+        filename: 文件名
 
-        return False
+    Returns:
+        是否可以流式解压
+    """
+    return filename.lower().endswith('.zip') or bool(_find_extractors(filename, streaming=True))
 
-    except Exception as e:
-        print(f"解压缩失败: {str(e)}", file=sys.stderr)
-        return False
+
+class _ResponseStream(io.RawIOBase):
+    """
+    把 HTTP 响应包装成只读的字节流，供 tarfile、gzip 等直接读取
+
+    读取中断时用 Range + If-Range 请求从当前位置续传；读到的数据可以同时写入 sink（缓存文件或 zip 缓冲区），
+    并增量计算 SHA-256
+    """
+
+    def __init__(self, url: str, headers: dict, response, sink=None):
+        self._url = url
+        self._headers = {k: v for k, v in headers.items() if k not in ('If-None-Match', 'If-Modified-Since')}
+        self._validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        # 响应内容经过 Content-Encoding 编码时，解码后的位置与 Range 的字节位置不一致，不能续传
+        self._resumable = not response.headers.get("Content-Encoding")
+        self._response = response
+        self._chunks = response.iter_content(chunk_size=STREAM_READ_SIZE)
+        self._pending = b''
+        self._sink = sink
+        self._position = 0
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self._attempt = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks, b'')
+            except _RESUMABLE_ERRORS:
+                self._reconnect()
+                continue
+            if not self._pending:
+                return 0
+            self.sha256.update(self._pending)
+            self.size += len(self._pending)
+            if self._sink is not None:
+                self._sink.write(self._pending)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        self._position += size
+        return size
+
+    def _reconnect(self):
+        """从当前位置重新请求剩余内容"""
+        self._attempt += 1
+        if not self._resumable or self._attempt > MAX_RETRIES:
+            raise requests.exceptions.ChunkedEncodingError("下载中断，无法续传")
+        time.sleep(RETRY_BACKOFF * 2 ** (self._attempt - 1))
+
+        # 已读入 _pending 但尚未返回的数据会被丢弃，从已交给 sink 的位置续传
+        offset = self._position + len(self._pending)
+        request_headers = dict(self._headers)
+        request_headers['Range'] = f'bytes={offset}-'
+        if self._validator:
+            request_headers['If-Range'] = self._validator
+        self._response.close()
+        self._response = _get_session().get(self._url, headers=request_headers, stream=True, timeout=30)
+        if self._response.status_code != 206 or not self._response.headers.get("Content-Range", "").startswith(f"bytes {offset}-"):
+            self._response.close()
+            raise requests.exceptions.ChunkedEncodingError("服务端不支持续传或文件已变化")
+        self._chunks = self._response.iter_content(chunk_size=STREAM_READ_SIZE)
+
+    def close(self):
+        self._response.close()
+        super().close()
+
+
+def _extract_stream(stream, filename: str, extract_to: Path, include: list[str] | None = None):
+    """
+    从字节流中解压 tar 系列格式或单文件压缩格式
+
+    Args:
+        stream: 可读的字节流
+        filename: 压缩包的原始文件名，用于判断格式
+        extract_to: 解压目标目录
+        include: 只解压匹配这些 glob 模式的文件，为 None 时全部解压
+    """
+    extractor = _find_extractors(filename, streaming=True)[0]
+    extractor.extract(stream, extract_to, filename.lower(), include)
+
+
+def _download_and_extract(url: str, filename: str, extract_to: Path, cache_dir: Path | None = None,
+                          include: list[str] | None = None, sha256: str | None = None,
+                          partial_dir: Path | None = None) -> dict:
+    """
+    边下载边解压，不在目标目录中保留压缩包
+
+    - tar 系列和 .gz/.bz2/.xz 直接从响应流中解压
+    - zip 需要随机访问，先写入 SpooledTemporaryFile，较小的 zip 不会落盘
+    - 启用缓存且响应带校验信息时，数据同时写入缓存文件；缓存命中（304）时直接从缓存文件解压
+    - 指定 sha256 且缓存中已有相同内容时，不发起请求，直接从缓存文件解压
+    - 指定 partial_dir 且响应可以续传时，数据同时写入 partial_dir 下的 .part 文件和进度记录，
+      解压失败时保留已下载的部分，调用方改用 _download_file 时从中断处继续，不必重新下载
+
+    Args:
+        url: 压缩包 URL
+        filename: 压缩包文件名
+        extract_to: 解压目标目录
+        cache_dir: 下载缓存目录，为 None 时不使用缓存
+        include: 只解压匹配这些 glob 模式的文件，为 None 时全部解压
+        sha256: 期望的压缩包 SHA-256，为 None 时不校验
+        partial_dir: 保存未完成下载的目录，与 _download_file 使用的相同；为 None 时不保留已下载的部分
+
+    Returns:
+        压缩包信息 {"size", "sha256", "cached"}
+
+    Raises:
+        requests.exceptions.RequestException: 下载失败
+        _IntegrityError: 压缩包的 SHA-256 与期望值不一致，不会写入缓存
+        其他异常: 解压失败，调用方应退回先下载再解压的方式
+    """
+    blob = cache_dir / "objects" / sha256 if cache_dir is not None and sha256 else None
+    if blob is not None and blob.is_file():
+        if not _extract_archive(blob, extract_to, filename, include):
+            raise OSError("解压缓存文件失败")
+        return {"size": blob.stat().st_size, "sha256": sha256, "cached": True}
+
+    headers = _get_download_headers(url)
+    cached = _cache_lookup(cache_dir, url) if cache_dir is not None else None
+    if cached:
+        if cached["etag"]:
+            headers['If-None-Match'] = cached["etag"]
+        if cached["last_modified"]:
+            headers['If-Modified-Since'] = cached["last_modified"]
+
+    response = _get_session().get(url, headers=headers, stream=True, timeout=30)
+    if cached and response.status_code == 304:
+        response.close()
+        if sha256 and cached["digest"] != sha256:
+            raise _IntegrityError(f"SHA-256 不匹配: 期望 {sha256}，实际 {cached['digest']}")
+        _cache_touch(cache_dir, url)
+        if not _extract_archive(cached["blob"], extract_to, filename, include):
+            raise OSError("解压缓存文件失败")
+        return {"size": cached["size"], "sha256": cached["digest"], "cached": True}
+    try:
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        response.close()
+        raise
+
+    validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    # 响应有校验信息且未经 Content-Encoding 编码时可以续传，数据写入 .part 文件
+    resumable = partial_dir is not None and bool(validators["etag"] or validators["last_modified"]) \
+        and not response.headers.get("Content-Encoding")
+    if resumable:
+        with _partial_lock(url, partial_dir) as key:
+            part_path = partial_dir / f"{key}.part"
+            meta_path = partial_dir / f"{key}.json"
+            total = response.headers.get("Content-Length")
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"url": url, **validators, "total": int(total) if total else None}, f)
+            try:
+                info = _stream_extract_response(url, filename, extract_to, response, headers, part_path,
+                                                include, sha256)
+            except _IntegrityError:
+                # 内容与期望不一致，已下载的部分没有用处；其他错误保留 .part 供续传
+                part_path.unlink(missing_ok=True)
+                meta_path.unlink()
+                raise
+            meta_path.unlink()
+            if cache_dir is not None:
+                _cache_store(cache_dir, url, part_path, {**validators, "sha256": info["sha256"]}, None)
+            else:
+                part_path.unlink()
+        return info
+
+    cache_path = None
+    if cache_dir is not None and (validators["etag"] or validators["last_modified"]):
+        (cache_dir / "objects").mkdir(parents=True, exist_ok=True)
+        cache_path = cache_dir / "objects" / f".{uuid.uuid4().hex}.tmp"
+    try:
+        info = _stream_extract_response(url, filename, extract_to, response, headers, cache_path, include, sha256)
+        if cache_path is not None:
+            _cache_store(cache_dir, url, cache_path, {**validators, "sha256": info["sha256"]}, None)
+        return info
+    finally:
+        if cache_path is not None and cache_path.exists():
+            cache_path.unlink()
+
+
+def _stream_extract_response(url: str, filename: str, extract_to: Path, response, headers: dict,
+                             sink_path: Path | None, include: list[str] | None, sha256: str | None) -> dict:
+    """
+    从响应流中解压，同时把收到的数据按顺序写入 sink_path
+
+    Args:
+        url: 压缩包 URL
+        filename: 压缩包文件名
+        extract_to: 解压目标目录
+        response: stream=True 的响应，结束时关闭
+        headers: 请求头，中途断开重新请求时使用
+        sink_path: 保存收到的数据的文件，为 None 时不保存
+        include: 只解压匹配这些 glob 模式的文件，为 None 时全部解压
+        sha256: 期望的压缩包 SHA-256，为 None 时不校验
+
+    Returns:
+        压缩包信息 {"size", "sha256", "cached"}；sink_path 中保存了完整的压缩包
+    """
+    is_zip = filename.lower().endswith('.zip')
+    sink = open(sink_path, 'w+b') if sink_path else None
+    try:
+        with _ResponseStream(url, headers, response, sink) as raw:
+            stream = io.BufferedReader(raw, STREAM_READ_SIZE)
+            if is_zip:
+                if sink is None:
+                    # 不缓存时用内存缓冲，超过上限才写入临时文件
+                    with tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE) as spool:
+                        with _span("transfer", url=url) as span:
+                            shutil.copyfileobj(stream, spool, STREAM_READ_SIZE)
+                            span["bytes"] = raw.size
+                        with _span("extract", file=filename, backend="zipfile"):
+                            _extract_zip(spool, extract_to, include=include)
+                else:
+                    # 读完响应后数据已全部写入 sink 文件，直接从文件解压
+                    with _span("transfer", url=url) as span:
+                        while stream.read(STREAM_READ_SIZE):
+                            pass
+                        sink.flush()
+                        span["bytes"] = raw.size
+                    with _span("extract", file=filename, backend="zipfile"):
+                        _extract_zip(sink_path, extract_to, include=include)
+            else:
+                # 下载和解压交替进行，无法分开计时
+                with _span("stream_extract", url=url, file=filename) as span:
+                    _extract_stream(stream, filename, extract_to, include)
+                    # 压缩流结束后可能还有未读完的数据，读完以保证缓存文件和 SHA-256 完整
+                    while stream.read(STREAM_READ_SIZE):
+                        pass
+                    span["bytes"] = raw.size
+            info = {"size": raw.size, "sha256": raw.sha256.hexdigest(), "cached": False}
+
+        if sha256 and info["sha256"] != sha256:
+            raise _IntegrityError(f"SHA-256 不匹配: 期望 {sha256}，实际 {info['sha256']}")
+        return info
+    finally:
+        if sink is not None:
+            sink.close()
 
 
 def _is_github_url(url: str) -> bool:
@@ -226,59 +1813,270 @@ def _normalize_github_url(url: str) -> str:
     return url
 
 
-def _download_github_repo(url: str, target_dir: Path) -> tuple[bool, str]:
+# GitHub 仓库的本地裸仓库缓存，位于用户缓存目录下；DOWNLOADER_GIT_CACHE 指定目录，设为 off/0/false 时禁用
+GIT_MIRROR_DIR_NAME = "git_mirrors"
+# 单次 git 命令的超时时间（秒）
+GIT_TIMEOUT = 60
+_git_mirror_locks: dict[str, threading.Lock] = {}
+_git_mirror_locks_guard = threading.Lock()
+
+
+class _GitError(Exception):
+    """git 命令执行失败，异常信息为给用户看的错误说明"""
+
+
+def _get_git_mirror_dir() -> Path | None:
+    """
+    获取 GitHub 仓库缓存目录（用户缓存目录下，与下载缓存放在一起）
+
+    Returns:
+        缓存目录路径，禁用缓存时返回 None
+    """
+    mirror_dir = os.environ.get("DOWNLOADER_GIT_CACHE")
+    if mirror_dir:
+        if mirror_dir.lower() in ("off", "0", "false"):
+            return None
+        return Path(mirror_dir).expanduser().resolve()
+    return _get_user_cache_root() / GIT_MIRROR_DIR_NAME
+
+
+def _git_env() -> dict:
+    """git 命令的环境变量，禁用所有交互式提示"""
+    env = os.environ.copy()
+    env['GIT_TERMINAL_PROMPT'] = '0'  # 禁用终端提示
+    env['GIT_ASKPASS'] = 'echo'  # 禁用密码提示
+    env['GIT_SSH_COMMAND'] = 'ssh -o BatchMode=yes'  # SSH 非交互模式
+    return env
+
+
+def _run_git(args: list[str]) -> str:
+    """
+    非交互地执行 git 命令
+
+    Args:
+        args: git 子命令及参数
+
+    Returns:
+        标准输出
+
+    Raises:
+        _GitError: 命令执行失败
+    """
+    result = subprocess.run(
+        ['git', *args],
+        capture_output=True,
+        text=True,
+        timeout=GIT_TIMEOUT,
+        env=_git_env(),
+        stdin=subprocess.DEVNULL  # 禁用标准输入
+    )
+    if result.returncode != 0:
+        raise _GitError(_git_error_message(result.stderr))
+    return result.stdout
+
+
+def _git_error_message(stderr: str) -> str:
+    """根据 git 的错误输出生成给用户看的错误说明"""
+    error_msg = stderr.lower()
+    if 'not found' in error_msg or 'repository not found' in error_msg or '404' in error_msg:
+        return "仓库不存在或无法访问"
+    elif 'authentication' in error_msg or 'permission denied' in error_msg or 'terminal prompts disabled' in error_msg:
+        return "仓库需要认证或权限不足"
+    elif "couldn't find remote ref" in error_msg or 'did not match' in error_msg or 'not a valid object' in error_msg:
+        return f"分支、标签或路径不存在: {stderr.strip()}"
+    else:
+        return f"克隆失败: {stderr.strip()}"
+
+
+@contextmanager
+def _git_mirror_lock(mirror: Path):
+    """
+    锁定一个裸仓库缓存，同一仓库的 fetch 和导出串行进行（进程内用线程锁，进程间在支持时用文件锁）
+    """
+    with _git_mirror_locks_guard:
+        lock = _git_mirror_locks.setdefault(str(mirror), threading.Lock())
+    with lock:
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        with open(mirror.parent / f"{mirror.name}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _update_git_mirror(https_url: str, mirror: Path, ref: str | None = None) -> str:
+    """
+    更新裸仓库缓存，只浅获取需要的一个分支、标签或提交
+
+    已有缓存时 git fetch 只传输缺少的对象，重复下载同一仓库是一次增量获取
+
+    Args:
+        https_url: 仓库的 HTTPS URL
+        mirror: 裸仓库路径
+        ref: 分支、标签或提交，为 None 时使用仓库的默认分支
+
+    Returns:
+        获取到的提交 ID
+    """
+    created = not (mirror / 'HEAD').exists()
+    if created:
+        _run_git(['init', '--bare', '--quiet', str(mirror)])
+        _run_git(['-C', str(mirror), 'remote', 'add', 'origin', https_url])
+
+    try:
+        _run_git(['-C', str(mirror), 'fetch', '--depth', '1', '--no-tags', '--quiet', 'origin', ref or 'HEAD'])
+    except (_GitError, subprocess.TimeoutExpired):
+        # 首次获取失败时不保留空的缓存仓库
+        if created:
+            shutil.rmtree(mirror, ignore_errors=True)
+        raise
+    commit = _run_git(['-C', str(mirror), 'rev-parse', 'FETCH_HEAD^{commit}']).strip()
+
+    # 记录到 refs/downloader/ 下，避免获取的提交被 git gc 清理
+    ref_name = re.sub(r'[^A-Za-z0-9._-]', '_', ref or 'HEAD')
+    _run_git(['-C', str(mirror), 'update-ref', f'refs/downloader/{ref_name}', commit])
+    return commit
+
+
+def _export_git_tree(mirror: Path, commit: str, target_dir: Path, paths: list[str] | None = None):
+    """
+    用 git archive 从裸仓库导出文件，边导出边解压到目标目录，不包含 .git 目录
+
+    Args:
+        mirror: 裸仓库路径
+        commit: 提交 ID
+        target_dir: 目标目录
+        paths: 只导出这些路径（稀疏导出），为 None 时导出全部文件
+    """
+    target_dir.mkdir(parents=True, exist_ok=True)
+    args = ['git', '-C', str(mirror), 'archive', '--format=tar', commit]
+    if paths:
+        args += ['--', *paths]
+
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               env=_git_env(), stdin=subprocess.DEVNULL)
+    extract_error = None
+    try:
+        _extract_tar_archive(process.stdout, target_dir, 'repo.tar', None)
+    except Exception as e:
+        extract_error = e
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode('utf-8', 'replace')
+        process.stderr.close()
+        process.wait(timeout=GIT_TIMEOUT)
+
+    if process.returncode != 0:
+        raise _GitError(_git_error_message(stderr))
+    if extract_error is not None:
+        raise extract_error
+
+
+# GitHub 仓库的下载方式：git 通过本地裸仓库缓存获取；archive 直接下载 codeload 的 tar.gz 快照，失败时改用 git
+DEFAULT_GITHUB_MODE = os.environ.get("DOWNLOADER_GITHUB_MODE", "git")
+GITHUB_MODES = ("git", "archive")
+# codeload 服务地址，可通过环境变量指向本地的测试服务
+CODELOAD_BASE_URL = os.environ.get("DOWNLOADER_CODELOAD_URL", "https://codeload.github.com").rstrip('/')
+
+
+def _download_github_archive(url: str, target_dir: Path, ref: str | None = None, paths: list[str] | None = None,
+                             cache_dir: Path | None = None) -> tuple[bool, str]:
+    """
+    通过 codeload 下载 GitHub 仓库某个版本的 tar.gz 快照，边下载边解压
+
+    复用 HTTP 连接池和下载缓存；快照中的顶级目录（repo-ref/）会被替换为 target_dir。
+    私有仓库、ref 不存在等情况会返回失败，由调用方改用 git 下载
+
+    Args:
+        url: GitHub 仓库 URL
+        target_dir: 目标目录
+        ref: 分支、标签或提交，为 None 时使用仓库的默认分支
+        paths: 只解压这些路径，为 None 时解压全部文件
+        cache_dir: 下载缓存目录，为 None 时不使用缓存
+
+    Returns:
+        (是否下载成功, 错误信息)
+    """
+    repo_path = urlparse(_normalize_github_url(url)).path.strip('/')
+    archive_url = f"{CODELOAD_BASE_URL}/{repo_path}/tar.gz/{quote(ref or 'HEAD', safe='/')}"
+    # 快照的顶级目录名不固定，路径前加一层 * 匹配
+    include = [f"/*/{path.strip('/')}" for path in paths] if paths else None
+
+    staging_dir = target_dir.parent / f".{target_dir.name}.{uuid.uuid4().hex[:8]}"
+    staging_dir.mkdir(parents=True)
+    try:
+        _download_and_extract(archive_url, 'repo.tar.gz', staging_dir, cache_dir, include)
+        entries = list(staging_dir.iterdir())
+        if len(entries) != 1 or not entries[0].is_dir():
+            return False, "快照中没有匹配的文件"
+        os.replace(entries[0], target_dir)
+        return True, ""
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if status in (401, 403, 404):
+            return False, "仓库不存在、是私有仓库或 ref 不存在"
+        return False, f"下载快照失败: {str(e)}"
+    except Exception as e:
+        return False, f"下载快照失败: {str(e)}"
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+
+def _download_github_repo(url: str, target_dir: Path, ref: str | None = None, paths: list[str] | None = None,
+                          mirror_root: Path | None = None) -> tuple[bool, str]:
     """
     下载 GitHub 仓库
 
+    先把仓库浅获取到本地裸仓库缓存中（已有缓存时为增量获取），再用 git archive 导出到目标目录
+
     Args:
         url: GitHub 仓库 URL
         target_dir: 目标目录
+        ref: 分支、标签或提交，为 None 时使用仓库的默认分支
+        paths: 只导出这些路径（稀疏导出），为 None 时导出全部文件
+        mirror_root: 裸仓库缓存目录，为 None 时使用用完即删的临时裸仓库
 
     Returns:
         (是否下载成功, 错误信息)
     """
+    temp_root = None
     try:
         # 标准化为 HTTPS URL
         https_url = _normalize_github_url(url)
 
-        # 设置环境变量，禁用所有交互式提示
-        env = os.environ.copy()
-        env['GIT_TERMINAL_PROMPT'] = '0'  # 禁用终端提示
-        env['GIT_ASKPASS'] = 'echo'  # 禁用密码提示
-        env['GIT_SSH_COMMAND'] = 'ssh -o BatchMode=yes'  # SSH 非交互模式
-
-        # 使用 git clone (HTTPS 协议，非交互模式)
-        result = subprocess.run(
-            ['git', 'clone', '--depth', '1', '--no-single-branch', https_url, str(target_dir)],
-            capture_output=True,
-            text=True,
-            timeout=60,  # 60秒超时
-            env=env,
-            stdin=subprocess.DEVNULL  # 禁用标准输入
-        )
-
-        if result.returncode == 0:
-            # 删除 .git 目录以节省空间
-            git_dir = target_dir / '.git'
-            if git_dir.exists():
-                shutil.rmtree(git_dir)
-            return True, ""
+        if mirror_root is None:
+            temp_root = tempfile.mkdtemp(prefix='git_mirror_')
+            mirror = Path(temp_root) / 'repo.git'
         else:
-            # 检查是否是仓库不存在
-            error_msg = result.stderr.lower()
-            if 'not found' in error_msg or 'repository not found' in error_msg or '404' in error_msg:
-                return False, "仓库不存在或无法访问"
-            elif 'authentication' in error_msg or 'permission denied' in error_msg or 'terminal prompts disabled' in error_msg:
-                return False, "仓库需要认证或权限不足"
-            else:
-                return False, f"克隆失败: {result.stderr.strip()}"
-
+            # 缓存目录名为 owner__repo.git
+            repo_path = urlparse(https_url).path.strip('/')
+            mirror = mirror_root / (re.sub(r'[^A-Za-z0-9._-]', '_', repo_path.replace('/', '__')) + '.git')
+
+        with _git_mirror_lock(mirror):
+            with _span("git_fetch", url=https_url, ref=ref) as span:
+                commit = _update_git_mirror(https_url, mirror, ref)
+                span["commit"] = commit
+            with _span("git_export", commit=commit, paths=paths):
+                _export_git_tree(mirror, commit, target_dir, paths)
+        return True, ""
+
+    except _GitError as e:
+        return False, str(e)
     except FileNotFoundError:
         return False, "未找到 git 命令，请先安装 git"
     except subprocess.TimeoutExpired:
         return False, "克隆超时"
     except Exception as e:
         return False, f"下载失败: {str(e)}"
+    finally:
+        if temp_root:
+            shutil.rmtree(temp_root, ignore_errors=True)
 
 
 def _get_download_headers(url: str) -> dict:
@@ -304,58 +2102,277 @@ def _get_download_headers(url: str) -> dict:
     return headers
 
 
-def _download_file(url: str, target_path: Path) -> bool:
+def _download_file(url: str, target_path: Path, cache_dir: Path | None = None,
+                   partial_dir: Path | None = None, segments: int = DEFAULT_SEGMENTS,
+                   sha256: str | None = None) -> dict | None:
     """
     下载文件
 
+    指定缓存目录时，已缓存的 URL 会带上 If-None-Match / If-Modified-Since 发送条件请求，
+    服务端返回 304 时直接使用缓存内容，只需一次往返；指定 sha256 且缓存中已有相同内容时不发起请求。
+    下载中断时自动断点续传，未完成的部分保存在 partial_dir 中，下次调用时继续。
+    segments 大于 1 时，对支持 Range 的大文件分段并发下载，不支持时退回单连接下载
+
     Args:
         url: 文件 URL
         target_path: 目标文件路径
+        cache_dir: 下载缓存目录，为 None 时不使用缓存
+        partial_dir: 保存未完成下载的目录，为 None 时使用目标文件所在目录
+        segments: 最大分段数，1 表示不分段
+        sha256: 期望的文件 SHA-256，为 None 时不校验；不一致时删除下载的文件并视为失败
 
     Returns:
-        是否下载成功
+        文件信息 {"size", "sha256", "cached"}，下载失败时返回 None
     """
     try:
+        # 缓存以内容摘要为键，已知摘要时可以直接复用其他 URL 下载过的相同内容
+        blob = cache_dir / "objects" / sha256 if cache_dir is not None and sha256 else None
+        if blob is not None and blob.is_file():
+            _reflink_or_copy(blob, target_path)
+            return {"size": blob.stat().st_size, "sha256": sha256, "cached": True}
+
         # 获取请求头
         headers = _get_download_headers(url)
 
-        # 发送 GET 请求
-        response = requests.get(url, headers=headers, stream=True, timeout=30)
-        response.raise_for_status()
-
-        # 写入文件
-        with open(target_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-
-        return True
+        cached = None
+        if cache_dir is not None:
+            cached = _cache_lookup(cache_dir, url)
+            if cached:
+                if cached["etag"]:
+                    headers['If-None-Match'] = cached["etag"]
+                if cached["last_modified"]:
+                    headers['If-Modified-Since'] = cached["last_modified"]
+
+        partial_dir = partial_dir or target_path.parent
+        if segments > 1 and hasattr(os, 'pwrite'):
+            try:
+                result = _fetch_segmented(url, headers, partial_dir, segments)
+            except _SegmentedFallback:
+                result = _fetch_resumable(url, headers, partial_dir)
+        else:
+            result = _fetch_resumable(url, headers, partial_dir)
+        if result is None:
+            if cached is None:
+                # 没有缓存却收到 304，视为异常响应
+                raise requests.exceptions.HTTPError("服务端返回 304，但本地没有缓存")
+            if sha256 and cached["digest"] != sha256:
+                raise _IntegrityError(f"SHA-256 不匹配: 期望 {sha256}，实际 {cached['digest']}")
+            _reflink_or_copy(cached["blob"], target_path)
+            _cache_touch(cache_dir, url)
+            return {"size": cached["size"], "sha256": cached["digest"], "cached": True}
+
+        file_path, validators = result
+        info = {"size": validators["size"], "sha256": validators["sha256"], "cached": False}
+        if sha256 and info["sha256"] != sha256:
+            file_path.unlink()
+            raise _IntegrityError(f"SHA-256 不匹配: 期望 {sha256}，实际 {info['sha256']}")
+
+        # 只有带校验信息的响应才能在下次重新验证，才值得缓存
+        if cache_dir is not None and (validators["etag"] or validators["last_modified"]):
+            return info if _cache_store(cache_dir, url, file_path, validators, target_path) else None
+
+        shutil.move(str(file_path), str(target_path))
+        return info
 
     except requests.exceptions.RequestException as e:
         print(f"下载文件失败: {str(e)}", file=sys.stderr)
-        return False
+        return None
+    except _IntegrityError as e:
+        print(f"文件校验失败: {str(e)}", file=sys.stderr)
+        return None
     except Exception as e:
         print(f"保存文件失败: {str(e)}", file=sys.stderr)
-        return False
+        return None
+
+
+def read_manifest(lines) -> list[dict]:
+    """
+    解析批量下载清单
+
+    每行一个 URL，或一个 JSON 对象 {"url": "...", "sha256": "..."}（sha256 可选，用于校验和去重）；
+    空行和以 # 开头的注释行会被忽略
+
+    Args:
+        lines: 清单内容的行迭代器
+
+    Returns:
+        [{"url": URL, "sha256": 期望的 SHA-256 或 None}, ...]
+    """
+    items = []
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('{'):
+            entry = json.loads(line)
+            items.append({"url": entry['url'], "sha256": _normalize_sha256(entry.get('sha256'))})
+        else:
+            items.append({"url": line, "sha256": None})
+    return items
+
+
+def _normalize_sha256(value: str | None) -> str | None:
+    """
+    规范化期望的 SHA-256，接受 "sha256:" 前缀和大写
+
+    Raises:
+        ValueError: 不是 64 位十六进制字符串
+    """
+    if not value:
+        return None
+    digest = value.lower().removeprefix('sha256:')
+    if not re.fullmatch(r'[0-9a-f]{64}', digest):
+        raise ValueError(f"无效的 SHA-256: {value}")
+    return digest
+
+
+# 每次下载的结果清单写在下载目录旁边（<下载目录>.manifest.json），不混入下载内容
+DOWNLOAD_MANIFEST_SUFFIX = ".manifest.json"
+
+
+def _get_download_manifest_path(target_dir: str | Path) -> Path:
+    """返回下载目录对应的结果清单路径"""
+    target_dir = Path(target_dir)
+    return target_dir.with_name(target_dir.name + DOWNLOAD_MANIFEST_SUFFIX)
+
+
+def read_download_manifest(path: str | Path) -> dict | None:
+    """
+    读取下载目录对应的结果清单
+
+    Args:
+        path: download_resource 返回的下载目录
+
+    Returns:
+        {"url", "file", "size", "sha256", "cached", "duration", "throughput"}，
+        没有清单（GitHub 仓库或下载失败）时返回 None
+    """
+    try:
+        with open(_get_download_manifest_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_download_manifest(target_dir: Path, url: str, filename: str, info: dict, duration: float):
+    """将单次下载的大小、SHA-256、耗时和吞吐量写入下载目录旁边的结果清单"""
+    manifest = {
+        "url": url,
+        "file": filename,
+        "size": info["size"],
+        "sha256": info["sha256"],
+        "cached": info["cached"],
+        "duration": round(duration, 3),
+        # 字节/秒
+        "throughput": round(info["size"] / duration) if duration > 0 else None,
+    }
+    with open(_get_download_manifest_path(target_dir), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
 
 
-def download_resource(url: str, silent: bool = False, tmp_root: str | None = None) -> str:
+def download_resources(urls: list[str | dict], silent: bool = False, tmp_root: str | None = None,
+                       jobs: int = DEFAULT_JOBS, segments: int = DEFAULT_SEGMENTS,
+                       include: list[str] | None = None, ref: str | None = None,
+                       paths: list[str] | None = None,
+                       github_mode: str = DEFAULT_GITHUB_MODE) -> list[dict]:
+    """
+    使用有上限的线程池并发下载多个资源
+
+    每个 URL 仍然下载到各自的随机文件夹中，单个 URL 失败不影响其他 URL
+
+    Args:
+        urls: 资源 URL 列表，元素也可以是 read_manifest 返回的 {"url", "sha256"}
+        silent: 是否静默模式（不输出日志）
+        tmp_root: 临时目录的根路径。如果为 None，则使用 workspace/.tmp
+        jobs: 最大并发数
+        segments: 单个大文件的最大分段数，1 表示不分段
+        include: 压缩包只解压匹配这些 glob 模式的文件，为 None 时全部解压
+        ref: GitHub 仓库的分支、标签或提交，为 None 时使用默认分支
+        paths: GitHub 仓库只导出这些路径，为 None 时导出全部文件
+        github_mode: GitHub 仓库的下载方式，git 或 archive（下载 tar.gz 快照，失败时改用 git）
+
+    Returns:
+        [{"url": URL, "path": 下载结果}, ...]，顺序与输入一致，path 的含义与 download_resource 的返回值相同
+    """
+    if not urls:
+        return []
+
+    def download_one(item: str | dict) -> dict:
+        url, sha256 = (item["url"], item.get("sha256")) if isinstance(item, dict) else (item, None)
+        return {"url": url, "path": _download_single_resource(url, silent, tmp_root, segments, include, ref, paths,
+                                                              github_mode, sha256)}
+
+    workers = max(1, min(jobs, len(urls)))
+    _ensure_pool_size(workers * max(1, segments))
+    started = time.perf_counter()
+    with _trace_lock:
+        _trace_totals.clear()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(download_one, urls))
+    _trace_summary(results, time.perf_counter() - started)
+    return results
+
+
+def download_resource(url: str | list[str], silent: bool = False, tmp_root: str | None = None,
+                      jobs: int = DEFAULT_JOBS, segments: int = DEFAULT_SEGMENTS,
+                      include: list[str] | None = None, ref: str | None = None,
+                      paths: list[str] | None = None,
+                      github_mode: str = DEFAULT_GITHUB_MODE, sha256: str | None = None) -> str | list[dict]:
     """
     下载资源到本地
 
     支持：
     - 图片、视频、音频、文档等普通文件
     - 压缩包（自动解压）
-    - GitHub 仓库（使用 git clone）
+    - GitHub 仓库（通过本地裸仓库缓存增量获取，再用 git archive 导出）
 
     Args:
-        url: 资源 URL
+        url: 资源 URL；传入 URL 列表时并发下载，等同于 download_resources
         silent: 是否静默模式（不输出日志）
         tmp_root: 临时目录的根路径。如果为 None，则使用 workspace/.tmp
+        jobs: 传入 URL 列表时的最大并发数
+        segments: 单个大文件的最大分段数，服务端支持 Range 时分段并发下载；1 表示不分段
+        include: 压缩包只解压匹配这些 glob 模式的文件（例如 ["*.h", "libs/**"]），为 None 时全部解压
+        ref: GitHub 仓库的分支、标签或提交，为 None 时使用默认分支
+        paths: GitHub 仓库只导出这些路径（例如 ["src", "README.md"]），为 None 时导出全部文件
+        github_mode: GitHub 仓库的下载方式。git：通过本地裸仓库缓存获取；
+            archive：直接下载 codeload 的 tar.gz 快照，私有仓库等情况下改用 git
+        sha256: 期望的文件 SHA-256（GitHub 仓库不适用）。不一致时视为下载失败；
+            缓存中已有相同内容时直接复用，不发起请求
 
     Returns:
         下载后的文件夹路径。失败时返回包含错误信息的字符串格式。
+        普通文件下载成功后，下载目录旁边的 <下载目录>.manifest.json 记录大小、SHA-256、耗时和吞吐量，
+        可以用 read_download_manifest 读取；下载目录中只有下载内容。
+        传入 URL 列表时返回 [{"url": URL, "path": 下载结果}, ...]
+    """
+    if isinstance(url, (list, tuple)):
+        return download_resources(list(url), silent, tmp_root, jobs, segments, include, ref, paths, github_mode)
+    _ensure_pool_size(segments)
+    return _download_single_resource(url, silent, tmp_root, segments, include, ref, paths, github_mode,
+                                     _normalize_sha256(sha256))
+
+
+def _download_single_resource(url: str, silent: bool = False, tmp_root: str | None = None,
+                              segments: int = DEFAULT_SEGMENTS, include: list[str] | None = None,
+                              ref: str | None = None, paths: list[str] | None = None,
+                              github_mode: str = DEFAULT_GITHUB_MODE, sha256: str | None = None) -> str:
+    """
+    下载单个资源到本地，参数和返回值同 download_resource
     """
+    with _span("resource", url=url) as span:
+        result = _download_single_resource_inner(url, silent, tmp_root, segments, include, ref, paths,
+                                                 github_mode, sha256)
+        if _is_failed(result):
+            span["status"] = "error"
+            span["error"] = result
+        return result
+
+
+def _download_single_resource_inner(url: str, silent: bool, tmp_root: str | None, segments: int,
+                                    include: list[str] | None, ref: str | None, paths: list[str] | None,
+                                    github_mode: str, sha256: str | None) -> str:
+    """下载单个资源的实现，由 _download_single_resource 记录整体耗时"""
     def log(msg):
         if not silent:
             print(msg, file=sys.stderr)
@@ -366,12 +2383,27 @@ def download_resource(url: str, silent: bool = False, tmp_root: str | None = Non
 
         # 判断是否是 GitHub 仓库
         if _is_github_url(url):
-            log(f"检测到 GitHub 仓库，使用 git clone 下载...")
             # 为 GitHub 仓库创建子目录
             repo_name = url.rstrip('/').split('/')[-1].replace('.git', '')
             repo_dir = target_dir / repo_name
 
-            success, error_msg = _download_github_repo(url, repo_dir)
+            success = False
+            if github_mode == "archive":
+                log("检测到 GitHub 仓库，下载 tar.gz 快照...")
+                with _span("github_archive", url=url, ref=ref) as span:
+                    success, error_msg = _download_github_archive(url, repo_dir, ref, paths, _get_cache_dir())
+                    if not success:
+                        span.update(status="error", error=error_msg)
+                if not success:
+                    log(f"下载快照失败（{error_msg}），改用 git 下载...")
+                    shutil.rmtree(repo_dir, ignore_errors=True)
+
+            if not success:
+                log("检测到 GitHub 仓库，使用 git 下载...")
+                with _span("github_repo", url=url, ref=ref) as span:
+                    success, error_msg = _download_github_repo(url, repo_dir, ref, paths, _get_git_mirror_dir())
+                    if not success:
+                        span.update(status="error", error=error_msg)
             if success:
                 log(f"GitHub 仓库下载成功: {repo_dir}")
                 return str(target_dir)
@@ -388,10 +2420,45 @@ def download_resource(url: str, silent: bool = False, tmp_root: str | None = Non
         log(f"开始下载: {url}")
         log(f"保存到: {file_path}")
 
-        if not _download_file(url, file_path):
+        cache_dir = _get_cache_dir()
+        started = time.perf_counter()
+
+        # 可流式解压的压缩包边下载边解压，不落盘中间压缩包；分段下载需要完整文件，不走这条路径
+        if segments <= 1 and _is_streamable_archive(filename):
+            extract_dir = target_dir / "extracted"
+            extract_dir.mkdir(exist_ok=True)
+            try:
+                with _span("download", url=url, mode="stream") as span:
+                    info = _download_and_extract(url, filename, extract_dir, cache_dir, include, sha256,
+                                                 _get_partial_dir())
+                    span.update(bytes=info["size"], cached=info["cached"])
+                _write_download_manifest(target_dir, url, filename, info, time.perf_counter() - started)
+                log(f"下载并解压完成: {extract_dir}")
+                return str(target_dir)
+            except requests.exceptions.RequestException as e:
+                print(f"下载文件失败: {str(e)}", file=sys.stderr)
+                shutil.rmtree(target_dir, ignore_errors=True)
+                return "下载失败。文件下载失败"
+            except _IntegrityError as e:
+                print(f"文件校验失败: {str(e)}", file=sys.stderr)
+                shutil.rmtree(target_dir, ignore_errors=True)
+                return "下载失败。文件校验失败"
+            except Exception as e:
+                # 已下载的部分保存在 .part 中，先下载再解压时从中断处继续
+                print(f"流式解压失败，改为先下载再解压: {str(e)}", file=sys.stderr)
+                shutil.rmtree(extract_dir, ignore_errors=True)
+
+        with _span("download", url=url, segments=segments) as span:
+            info = _download_file(url, file_path, cache_dir, _get_partial_dir(), segments, sha256)
+            if info is None:
+                span["status"] = "error"
+            else:
+                span.update(bytes=info["size"], cached=info["cached"])
+        if info is None:
             # 清理失败的下载
             shutil.rmtree(target_dir, ignore_errors=True)
             return "下载失败。文件下载失败"
+        _write_download_manifest(target_dir, url, filename, info, time.perf_counter() - started)
 
         log(f"下载完成: {file_path}")
 
@@ -403,7 +2470,7 @@ def download_resource(url: str, silent: bool = False, tmp_root: str | None = Non
             extract_dir = target_dir / "extracted"
             extract_dir.mkdir(exist_ok=True)
 
-            if _extract_archive(file_path, extract_dir):
+            if _extract_archive(file_path, extract_dir, include=include):
                 log(f"解压成功: {extract_dir}")
                 # 删除原始压缩包以节省空间
                 file_path.unlink()
@@ -417,24 +2484,120 @@ def download_resource(url: str, silent: bool = False, tmp_root: str | None = Non
         return f"下载失败。{str(e)}"
 
 
+def _is_failed(result: str) -> bool:
+    """判断下载结果是否表示失败（空字符串或以"下载失败"开头）"""
+    return not result or result.startswith("下载失败")
+
+
 # 命令行入口
 if __name__ == "__main__":
-    import json
-
-    if len(sys.argv) < 2:
+    args = sys.argv[1:]
+
+    # 解析 --jobs 和 --segments 参数
+    options = {'--jobs': DEFAULT_JOBS, '--segments': DEFAULT_SEGMENTS}
+    for option in options:
+        if option in args:
+            index = args.index(option)
+            try:
+                options[option] = int(args[index + 1])
+            except (IndexError, ValueError):
+                print(json.dumps({"error": f"{option} 需要一个整数参数"}))
+                sys.exit(1)
+            del args[index:index + 2]
+    jobs = options['--jobs']
+    segments = options['--segments']
+
+    # 解析 --github-mode 参数
+    github_mode = DEFAULT_GITHUB_MODE
+    if '--github-mode' in args:
+        index = args.index('--github-mode')
+        github_mode = args[index + 1] if index + 1 < len(args) else ''
+        if github_mode not in GITHUB_MODES:
+            print(json.dumps({"error": f"--github-mode 只能是 {' 或 '.join(GITHUB_MODES)}"}, ensure_ascii=False))
+            sys.exit(1)
+        del args[index:index + 2]
+
+    # 解析 --include、--path、--ref 和 --trace 参数，--include 和 --path 可以重复指定
+    values = {'--include': [], '--path': [], '--ref': [], '--trace': []}
+    for option in values:
+        while option in args:
+            index = args.index(option)
+            if index + 1 >= len(args):
+                print(json.dumps({"error": f"{option} 需要一个参数"}))
+                sys.exit(1)
+            values[option].append(args[index + 1])
+            del args[index:index + 2]
+    include = values['--include'] or None
+    paths = values['--path'] or None
+    ref = values['--ref'][-1] if values['--ref'] else None
+    if values['--trace']:
+        try:
+            set_trace_output(values['--trace'][-1])
+        except OSError as e:
+            print(json.dumps({"error": f"打开追踪文件失败: {str(e)}"}, ensure_ascii=False))
+            sys.exit(1)
+
+    # 解析 --sha256 参数
+    sha256 = None
+    if '--sha256' in args:
+        index = args.index('--sha256')
+        try:
+            sha256 = _normalize_sha256(args[index + 1] if index + 1 < len(args) else '')
+            if sha256 is None:
+                raise ValueError("--sha256 需要一个参数")
+        except ValueError as e:
+            print(json.dumps({"error": str(e)}, ensure_ascii=False))
+            sys.exit(1)
+        del args[index:index + 2]
+
+    # 批量模式：每个 URL 输出一行 JSON 结果，全部成功时退出码为 0
+    if args and args[0] == '--manifest':
+        if len(args) < 2:
+            print(json.dumps({"error": "缺少清单文件参数"}))
+            sys.exit(1)
+        manifest = args[1]
+        tmp_root = args[2] if len(args) > 2 else None
+        try:
+            if manifest == '-':
+                urls = read_manifest(sys.stdin)
+            else:
+                with open(manifest, 'r', encoding='utf-8') as f:
+                    urls = read_manifest(f)
+        except (OSError, ValueError, KeyError) as e:
+            print(json.dumps({"error": f"读取清单失败: {str(e)}"}, ensure_ascii=False))
+            sys.exit(1)
+
+        results = download_resources(urls, silent=True, tmp_root=tmp_root, jobs=jobs, segments=segments,
+                                     include=include, ref=ref, paths=paths, github_mode=github_mode)
+        for item in results:
+            if not item["path"]:
+                item["path"] = "下载失败。未知错误"
+            elif not _is_failed(item["path"]):
+                manifest = read_download_manifest(item["path"])
+                if manifest:
+                    item["manifest"] = manifest
+            print(json.dumps(item))
+        sys.exit(1 if any(_is_failed(item["path"]) for item in results) else 0)
+
+    if len(args) < 1:
         print(json.dumps({"error": "缺少 URL 参数"}))
         sys.exit(1)
 
-    url = sys.argv[1]
-    tmp_root = sys.argv[2] if len(sys.argv) > 2 else None
-    result = download_resource(url, silent=True, tmp_root=tmp_root)
+    url = args[0]
+    tmp_root = args[1] if len(args) > 1 else None
+    result = download_resource(url, silent=True, tmp_root=tmp_root, segments=segments, include=include,
+                               ref=ref, paths=paths, github_mode=github_mode, sha256=sha256)
 
     # 判断是否下载失败（结果以"下载失败"开头）
     if result and result.startswith("下载失败"):
         print(json.dumps({"path": result}))
         sys.exit(1)
     elif result:
-        print(json.dumps({"path": result}))
+        output = {"path": result}
+        manifest = read_download_manifest(result)
+        if manifest:
+            output["manifest"] = manifest
+        print(json.dumps(output))
     else:
         print(json.dumps({"path": "下载失败。未知错误"}))
         sys.exit(1)
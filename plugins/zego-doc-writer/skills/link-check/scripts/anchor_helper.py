@@ -5,7 +5,44 @@
 import re
 import os
 import sys
-from typing import List, Tuple, Optional
+import json
+import atexit
+import select
+import shutil
+import socket
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple, Optional
+
+# 构建锚点索引时扫描的文档后缀
+DOC_EXTENSIONS = ('.mdx', '.md')
+
+# 解析结果缓存文件名，默认位于 workspace 根目录的 .tmp 目录下
+CACHE_FILE_NAME = 'anchor_cache.sqlite3'
+# 解析逻辑的版本号，锚点提取规则变化时需要递增，使旧缓存失效
+CACHE_VERSION = 1
+
+# 常驻服务的 socket 文件名，默认位于 workspace 根目录的 .tmp 目录下
+SOCKET_FILE_NAME = 'anchor_helper.sock'
+# 常驻服务空闲时检查文件变化的间隔（秒）
+DAEMON_POLL_INTERVAL = 2.0
+# 常驻服务的连接在这么多秒内没有收到完整的请求行时断开，避免一个客户端占住服务
+DAEMON_CONNECTION_TIMEOUT = 30.0
+
+
+# 预编译的标题/锚点匹配模式
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+_TRAILING_ANCHOR_RE = re.compile(r'\s*<a\s+id=["\'][^"\']*["\']\s*/>\s*$')
+_INLINE_ANCHOR_RE = re.compile(r'<a\s+id=["\']([^"\']+)["\']\s*/>')
+_ANCHOR_LINE_RE = re.compile(r'^<a\s+id=["\']([^"\']+)["\']\s*/>\s*$')
+_SLUG_REMOVE_RE = re.compile(r'[^\w\s-]')
+_SLUG_SEPARATOR_RE = re.compile(r'[\s_]+')
+# 合法锚点名：小写/大写英文、数字和连字符
+_ANCHOR_NAME_RE = re.compile(r'^[a-zA-Z0-9-]+$')
 
 
 def slugify(text: str) -> str:
@@ -16,9 +53,9 @@ def slugify(text: str) -> str:
     # 转小写
     text = text.lower()
     # 移除特殊字符，只保留字母数字和连字符/空格
-    text = re.sub(r'[^\w\s-]', '', text)
+    text = _SLUG_REMOVE_RE.sub('', text)
     # 空格和下划线转连字符
-    text = re.sub(r'[\s_]+', '-', text)
+    text = _SLUG_SEPARATOR_RE.sub('-', text)
     # 移除首尾的连字符
     text = text.strip('-')
     return text
@@ -27,97 +64,141 @@ def slugify(text: str) -> str:
 def extract_headings_with_anchors(content: str) -> List[Tuple[str, str, int]]:
     """
     提取所有标题及其对应的锚点。
+    返回: [(标题文本, 锚点, 行号), ...]
+    """
+    return scan_headings(content.split('\n'))
+
+
+def scan_headings(lines: Iterable[str]) -> List[Tuple[str, str, int]]:
+    """
+    单次顺序扫描所有行，提取标题及其对应的锚点。
+
+    锚点规则：
+    1. 标题行内有 <a id="..." />，使用行内锚点
+    2. 标题前的第一个非空行是单独的 <a id="..." /> 行，使用该锚点
+    3. 否则使用 slugified 标题
+
+    扫描时记录"待用锚点"：遇到单独的锚点行时记下，遇到空行时保留，
+    遇到其他非空行时清除，因此无需从每个标题往回查找。
+
+    参数:
+        lines: 文档的行（不含换行符）
+
     返回: [(标题文本, 锚点, 行号), ...]
     """
     headings = []
-    lines = content.split('\n')
+    pending_anchor = None
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+    for line_no, line in enumerate(lines, 1):
         # 匹配 markdown 标题
-        match = re.match(r'^(#{1,6})\s+(.+)$', line)
-        if match:
-            # 提取标题文本（去掉行内可能存在的锚点标签）
-            title_with_anchor = match.group(2).strip()
-            title = re.sub(r'\s*<a\s+id=["\'][^"\']*["\']\s*/>\s*$', '', title_with_anchor)
-
-            # 检查行内是否有 <a id="..." />
-            inline_anchor_match = re.search(r'<a\s+id=["\']([^"\']+)["\']\s*/>', line)
-            if inline_anchor_match:
-                # 行内显式锚点
-                anchor = inline_anchor_match.group(1)
-            else:
-                # 往上查找第一个非空行，如果是 <a id="..." /> 则作为锚点
-                anchor = None
-                j = i - 1
-                while j >= 0:
-                    prev_line = lines[j].strip()
-                    # 如果遇到空行，继续往上找
-                    if not prev_line:
-                        j -= 1
-                        continue
-                    # 如果遇到标题，停止查找
-                    if re.match(r'^#{1,6}\s', prev_line):
-                        break
-                    # 如果是 <a id="..." /> 标签，使用作为锚点
-                    if re.match(r'^<a\s+id=["\'][^"\']+["\']\s*/>\s*$', prev_line):
-                        anchor_match = re.search(r'<a\s+id=["\']([^"\']+)["\']\s*/>', prev_line)
-                        if anchor_match:
-                            anchor = anchor_match.group(1)
-                        break
-                    # 如果是其他内容，停止查找
-                    break
+        if line.startswith('#'):
+            match = _HEADING_RE.match(line)
+            if match:
+                # 提取标题文本（去掉行内可能存在的锚点标签）
+                title = _TRAILING_ANCHOR_RE.sub('', match.group(2).strip())
+
+                inline_anchor_match = _INLINE_ANCHOR_RE.search(line)
+                if inline_anchor_match:
+                    # 行内显式锚点
+                    anchor = inline_anchor_match.group(1)
+                else:
+                    # 前一个非空行的显式锚点，没有则使用 slugified 标题
+                    anchor = pending_anchor or slugify(title)
 
-                # 如果没有找到显式锚点，使用 slugified 标题
-                if not anchor:
-                    anchor = slugify(title)
+                headings.append((title, anchor, line_no))
+                pending_anchor = None
+                continue
 
-            headings.append((title, anchor, i + 1))
-        i += 1
+        stripped = line.strip()
+        # 空行不影响待用锚点
+        if not stripped:
+            continue
+        # 单独的 <a id="..." /> 行作为下一个标题的锚点，其他内容则清除待用锚点
+        anchor_match = _ANCHOR_LINE_RE.match(stripped) if stripped.startswith('<a') else None
+        pending_anchor = anchor_match.group(1) if anchor_match else None
 
     return headings
 
 
+# ParamField 开始标签（标签名后必须有空白字符）和结束标签
+_PARAM_OPEN_RE = re.compile(r'<ParamField\s')
+_PARAM_OPEN_PREFIX_LEN = len('<ParamField')
+_PARAM_CLOSE = '</ParamField>'
+# 需要提取的 ParamField 属性
+_PARAM_PROP_RES = (
+    ('name', re.compile(r'name\s*=\s*["\']([^"\']+)["\']')),
+    ('anchor_suffix', re.compile(r'anchor_suffix\s*=\s*["\']([^"\']+)["\']')),
+    ('parent_name', re.compile(r'parent_name\s*=\s*["\']([^"\']+)["\']')),
+    ('parent_type', re.compile(r'parent_type\s*=\s*["\']([^"\']+)["\']')),
+)
+# 读取文件时每次读取的字符数
+READ_CHUNK_SIZE = 1024 * 1024
+
+
 def extract_param_fields(content: str) -> List[dict]:
     """
     提取所有 ParamField 组件及其生成的锚点。
     返回: [ParamField 信息字典, ...]
     """
-    param_fields = []
+    return list(iter_param_fields([content]))
 
-    # 匹配 ParamField 组件
-    # 使用多行匹配模式
-    pattern = r'<ParamField\s+(.*?)>(.*?)</ParamField>'
-    matches = re.findall(pattern, content, re.DOTALL)
 
-    for props_str, body in matches:
-        props = {}
+def iter_param_fields(chunks: Iterable[str]) -> Iterator[dict]:
+    """
+    流式提取 ParamField 组件的属性（name、anchor_suffix、parent_name、parent_type）。
 
-        # 提取 name 属性
-        name_match = re.search(r'name\s*=\s*["\']([^"\']+)["\']', props_str)
-        if name_match:
-            props['name'] = name_match.group(1)
+    逐块扫描，只保留开始标签的属性文本，组件内容直接跳过，不会保存在内存中。
+    匹配规则与 <ParamField\\s+(.*?)>(.*?)</ParamField> 的非重叠匹配一致：
+    开始标签到第一个 > 为属性，之后到第一个 </ParamField> 为组件内容，没有结束标签的组件会被忽略。
+
+    参数:
+        chunks: 文档内容分块，可以是任意大小
 
-        # 提取 anchor_suffix 属性
-        suffix_match = re.search(r'anchor_suffix\s*=\s*["\']([^"\']+)["\']', props_str)
-        if suffix_match:
-            props['anchor_suffix'] = suffix_match.group(1)
+    返回: 逐个产出 ParamField 信息字典
+    """
+    # 扫描状态: 'open' 查找开始标签，'props' 查找开始标签的 >，'body' 查找结束标签
+    state = 'open'
+    buffer = ''
+    pos = 0
 
-        # 提取 parent_name 属性
-        parent_name_match = re.search(r'parent_name\s*=\s*["\']([^"\']+)["\']', props_str)
-        if parent_name_match:
-            props['parent_name'] = parent_name_match.group(1)
+    for chunk in chunks:
+        # 丢弃已扫描的部分，只保留可能跨块的尾部
+        buffer = buffer[pos:] + chunk
+        pos = 0
 
-        # 提取 parent_type 属性
-        parent_type_match = re.search(r'parent_type\s*=\s*["\']([^"\']+)["\']', props_str)
-        if parent_type_match:
-            props['parent_type'] = parent_type_match.group(1)
+        while True:
+            if state == 'open':
+                match = _PARAM_OPEN_RE.search(buffer, pos)
+                if not match:
+                    pos = max(pos, len(buffer) - _PARAM_OPEN_PREFIX_LEN)
+                    break
+                pos = match.end()
+                state = 'props'
 
-        if props:
-            param_fields.append(props)
+            elif state == 'props':
+                end = buffer.find('>', pos)
+                if end < 0:
+                    # 属性未结束，保留 pos 之后的内容等待下一块
+                    break
+                props_str = buffer[pos:end]
+                pos = end + 1
+                state = 'body'
 
-    return param_fields
+            else:
+                end = buffer.find(_PARAM_CLOSE, pos)
+                if end < 0:
+                    pos = max(pos, len(buffer) - len(_PARAM_CLOSE) + 1)
+                    break
+                pos = end + len(_PARAM_CLOSE)
+                state = 'open'
+
+                props = {}
+                for prop_name, prop_re in _PARAM_PROP_RES:
+                    prop_match = prop_re.search(props_str)
+                    if prop_match:
+                        props[prop_name] = prop_match.group(1)
+                if props:
+                    yield props
 
 
 def generate_param_field_anchors(param_field: dict) -> List[str]:
@@ -169,6 +250,316 @@ def generate_param_field_anchors(param_field: dict) -> List[str]:
     return list(set(anchors))  # 去重
 
 
+class FileAnchors(NamedTuple):
+    """单个文件解析出的锚点信息"""
+    # [(标题文本, 锚点, 行号), ...]
+    headings: List[Tuple[str, str, int]]
+    # ParamField 生成的所有锚点（去重并排序）
+    param_anchors: List[str]
+
+    @property
+    def anchors(self) -> Set[str]:
+        """文件中所有有效锚点"""
+        return {anchor for _, anchor, _ in self.headings} | set(self.param_anchors)
+
+
+def parse_file_anchors(content: str) -> FileAnchors:
+    """
+    解析文档内容，提取标题锚点和 ParamField 锚点。
+    """
+    param_anchors = set()
+    for param_field in extract_param_fields(content):
+        param_anchors.update(generate_param_field_anchors(param_field))
+    return FileAnchors(extract_headings_with_anchors(content), sorted(param_anchors))
+
+
+def parse_file(file_path: str) -> FileAnchors:
+    """
+    流式解析文件，提取标题锚点和 ParamField 锚点，不会一次性读入整个文件。
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        headings = scan_headings(line[:-1] if line.endswith('\n') else line for line in f)
+
+        f.seek(0)
+        param_anchors = set()
+        for param_field in iter_param_fields(iter(lambda: f.read(READ_CHUNK_SIZE), '')):
+            param_anchors.update(generate_param_field_anchors(param_field))
+
+    return FileAnchors(headings, sorted(param_anchors))
+
+
+def _file_digest(file_path: str) -> str:
+    """分块计算文件内容的 SHA-1"""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_cache_conn = None
+_cache_disabled = False
+# 内存缓存 {(缓存类别, 文件绝对路径): (mtime_ns, size, 解析结果)}，常驻进程中保持索引常驻内存
+_memory_cache: Dict[Tuple[str, str], tuple] = {}
+# 已使用的缓存类别 {缓存类别: (解析函数, 还原函数)}，用于文件变化后重新解析
+_cache_kinds: Dict[str, Tuple[Callable, Callable]] = {}
+
+
+def _get_cache_path() -> str:
+    """
+    获取缓存文件路径。
+    优先使用环境变量 ANCHOR_HELPER_CACHE，否则使用 workspace/.tmp/anchor_cache.sqlite3
+    """
+    cache_path = os.environ.get('ANCHOR_HELPER_CACHE')
+    if cache_path:
+        return cache_path
+    workspace_root = os.environ.get('CLAUDE_CODE_WORKSPACE') or os.getcwd()
+    return os.path.join(workspace_root, '.tmp', CACHE_FILE_NAME)
+
+
+def get_cache() -> Optional[sqlite3.Connection]:
+    """
+    打开（必要时创建）缓存数据库。
+    设置环境变量 ANCHOR_HELPER_CACHE=off 或缓存无法打开时返回 None，此时不使用缓存。
+    """
+    global _cache_conn, _cache_disabled
+    if _cache_conn is not None or _cache_disabled:
+        return _cache_conn
+
+    cache_path = _get_cache_path()
+    if cache_path.lower() in ('off', '0', 'false'):
+        _cache_disabled = True
+        return None
+
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        # 常驻服务在多个线程中处理请求（同一时间只有一个线程访问），连接需要允许跨线程使用
+        conn = sqlite3.connect(cache_path, timeout=10, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS file_cache ('
+            'kind TEXT, path TEXT, mtime_ns INTEGER, size INTEGER, digest TEXT, '
+            'version INTEGER, payload TEXT, PRIMARY KEY (kind, path))'
+        )
+        conn.commit()
+    except (sqlite3.Error, OSError) as e:
+        print(f'警告: 无法打开锚点缓存 {cache_path}: {e}', file=sys.stderr)
+        _cache_disabled = True
+        return None
+
+    _cache_conn = conn
+    atexit.register(flush_cache)
+    return conn
+
+
+def flush_cache():
+    """提交尚未写入的缓存记录"""
+    if _cache_conn is None:
+        return
+    try:
+        _cache_conn.commit()
+    except sqlite3.Error:
+        pass
+
+
+def load_file_anchors(file_path: str) -> Optional[FileAnchors]:
+    """
+    获取文件的锚点信息，优先使用磁盘缓存。
+
+    缓存以文件绝对路径为键，按以下顺序判断是否可复用：
+    1. mtime 和 size 均未变化，直接使用缓存，无需读取文件
+    2. mtime 或 size 变化但内容哈希未变化（如 git checkout 后），更新 mtime/size 后使用缓存
+    3. 否则重新解析并写入缓存
+
+    参数:
+        file_path: 文件路径
+
+    返回:
+        FileAnchors，文件不存在时返回 None
+    """
+    return load_many_file_anchors([file_path]).get(file_path)
+
+
+def load_many_file_anchors(file_paths: Iterable[str], jobs: int = 1) -> Dict[str, FileAnchors]:
+    """
+    批量获取文件的锚点信息，缓存规则同 load_file_anchors。
+    缓存未命中的文件可以使用多进程并行解析，结果在主进程中统一写入缓存。
+
+    参数:
+        file_paths: 文件路径列表
+        jobs: 并行解析的进程数，0 表示使用全部 CPU 核心
+
+    返回:
+        {文件路径: FileAnchors}，按输入顺序排列，不存在的文件不会出现在结果中
+    """
+    return load_many_cached('anchors', file_paths, parse_file, _decode_file_anchors, jobs)
+
+
+def load_many_cached(kind: str, file_paths: Iterable[str], parse: Callable, decode: Callable,
+                     jobs: int = 1) -> Dict[str, object]:
+    """
+    批量获取文件的解析结果，未变化的文件直接使用磁盘缓存。
+
+    参数:
+        kind: 缓存类别，不同解析结果使用不同类别，如 anchors、links
+        file_paths: 文件路径列表
+        parse: 解析函数，接收文件路径，返回可 JSON 序列化的结果（需为模块级函数）
+        decode: 将缓存中的 JSON 数据还原为解析结果
+        jobs: 并行解析的进程数，0 表示使用全部 CPU 核心
+
+    返回:
+        {文件路径: 解析结果}，按输入顺序排列，不存在的文件不会出现在结果中
+    """
+    file_paths = list(dict.fromkeys(file_paths))
+    _cache_kinds[kind] = (parse, decode)
+    results = {}
+    misses = []
+    for file_path in file_paths:
+        if not os.path.isfile(file_path):
+            continue
+        stat = os.stat(file_path)
+        key = os.path.abspath(file_path)
+
+        # 常驻进程中优先使用内存缓存
+        memory_entry = _memory_cache.get((kind, key))
+        if memory_entry and memory_entry[0] == stat.st_mtime_ns and memory_entry[1] == stat.st_size:
+            results[file_path] = memory_entry[2]
+            continue
+
+        payload, cache_entry = _lookup_cache(kind, key, stat)
+        if payload is not None:
+            results[file_path] = decode(json.loads(payload))
+            _memory_cache[(kind, key)] = (stat.st_mtime_ns, stat.st_size, results[file_path])
+        else:
+            misses.append((file_path, cache_entry))
+
+    parsed = parallel_map(parse, [file_path for file_path, _ in misses], jobs)
+    for (file_path, cache_entry), result in zip(misses, parsed):
+        _store_cache(kind, cache_entry, json.dumps(result, ensure_ascii=False))
+        key, stat, _ = cache_entry
+        _memory_cache[(kind, key)] = (stat.st_mtime_ns, stat.st_size, result)
+        results[file_path] = result
+
+    return {file_path: results[file_path] for file_path in file_paths if file_path in results}
+
+
+def _lookup_cache(kind: str, key: str, stat: os.stat_result) -> Tuple[Optional[str], tuple]:
+    """
+    查找文件的磁盘缓存记录。
+
+    参数:
+        kind: 缓存类别
+        key: 文件绝对路径
+        stat: 文件当前的 stat 信息
+
+    返回:
+        (命中的缓存数据, 写入缓存所需的 (路径, stat, 内容哈希))，未命中时缓存数据为 None
+    """
+    conn = get_cache()
+    row = None
+    if conn is not None:
+        try:
+            row = conn.execute(
+                'SELECT mtime_ns, size, digest, payload FROM file_cache '
+                'WHERE kind = ? AND path = ? AND version = ?',
+                (kind, key, CACHE_VERSION),
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+
+    if row and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+        return row[3], (key, stat, row[2])
+
+    digest = _file_digest(key)
+    cache_entry = (key, stat, digest)
+    if row and row[2] == digest:
+        # 内容未变化，只更新 mtime/size
+        _store_cache(kind, cache_entry, row[3])
+        return row[3], cache_entry
+
+    return None, cache_entry
+
+
+def _store_cache(kind: str, cache_entry: tuple, payload: str):
+    """写入缓存记录，缓存不可用时忽略"""
+    conn = get_cache()
+    if conn is None:
+        return
+    key, stat, digest = cache_entry
+    try:
+        conn.execute(
+            'INSERT OR REPLACE INTO file_cache '
+            '(kind, path, mtime_ns, size, digest, version, payload) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (kind, key, stat.st_mtime_ns, stat.st_size, digest, CACHE_VERSION, payload),
+        )
+    except sqlite3.Error:
+        pass
+
+
+def refresh_memory_cache() -> int:
+    """
+    检查内存缓存中的文件是否变化：已删除的文件移出缓存，已修改的文件重新解析。
+
+    返回:
+        重新解析或移除的文件数
+    """
+    changed = {}
+    for kind, key in list(_memory_cache):
+        mtime_ns, size, _ = _memory_cache[(kind, key)]
+        try:
+            stat = os.stat(key)
+        except OSError:
+            del _memory_cache[(kind, key)]
+            changed.setdefault(kind, []).append(key)
+            continue
+        if stat.st_mtime_ns != mtime_ns or stat.st_size != size:
+            changed.setdefault(kind, []).append(key)
+
+    for kind, keys in changed.items():
+        parse, decode = _cache_kinds[kind]
+        load_many_cached(kind, keys, parse, decode)
+    if changed:
+        flush_cache()
+    return sum(len(keys) for keys in changed.values())
+
+
+def parallel_map(func: Callable, items: List, jobs: int = 1) -> List:
+    """
+    使用多进程并行执行 func，结果顺序与输入一致。
+
+    参数:
+        func: 模块级函数（需要可被 pickle）
+        items: 输入列表
+        jobs: 进程数，0 表示使用全部 CPU 核心，1 表示在当前进程中执行
+
+    返回:
+        结果列表
+    """
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(items))
+    if jobs <= 1:
+        return [func(item) for item in items]
+
+    # 每个任务包含多个文件，减少进程间通信次数
+    chunk_size = max(1, len(items) // (jobs * 8))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, items, chunksize=chunk_size))
+
+
+def _decode_file_anchors(data: list) -> FileAnchors:
+    """将缓存数据还原为 FileAnchors"""
+    headings, param_anchors = data
+    return FileAnchors([tuple(item) for item in headings], param_anchors)
+
+
+def is_anchor_name(anchor: str) -> bool:
+    """锚点名是否符合规则（只包含英文字母、数字和连字符）"""
+    return bool(anchor) and _ANCHOR_NAME_RE.match(anchor) is not None
+
+
 def get_all_headings(mdx_file_path: str) -> List[str]:
     """
     获取文档中所有的 heading 标题文字。
@@ -179,14 +570,11 @@ def get_all_headings(mdx_file_path: str) -> List[str]:
     返回:
         标题文字列表，按文档顺序排列
     """
-    if not os.path.exists(mdx_file_path):
+    file_anchors = load_file_anchors(mdx_file_path)
+    if file_anchors is None:
         return []
 
-    with open(mdx_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    headings = extract_headings_with_anchors(content)
-    return [title for title, _, _ in headings]
+    return [title for title, _, _ in file_anchors.headings]
 
 
 def is_valid_anchor(mdx_file_path: str, anchor: str) -> bool:
@@ -207,29 +595,271 @@ def is_valid_anchor(mdx_file_path: str, anchor: str) -> bool:
     返回:
         True 如果锚点有效，False 否则
     """
-    if not anchor or not re.match(r'^[a-zA-Z0-9-]+$', anchor):
+    if not is_anchor_name(anchor):
         return False
 
-    if not os.path.exists(mdx_file_path):
+    file_anchors = load_file_anchors(mdx_file_path)
+    if file_anchors is None:
         return False
 
-    with open(mdx_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
     # 1. 检查 heading 锚点
-    headings = extract_headings_with_anchors(content)
-    for _, heading_anchor, _ in headings:
+    for _, heading_anchor, _ in file_anchors.headings:
         if heading_anchor == anchor:
             return True
 
     # 2. 检查 ParamField 生成的锚点
-    param_fields = extract_param_fields(content)
-    for param_field in param_fields:
-        anchors = generate_param_field_anchors(param_field)
-        if anchor in anchors:
-            return True
+    return anchor in file_anchors.param_anchors
 
-    return False
+
+def collect_anchors(content: str) -> Set[str]:
+    """
+    收集文档中所有有效的锚点（heading 锚点 + ParamField 生成的锚点）。
+    返回: 锚点集合
+    """
+    return parse_file_anchors(content).anchors
+
+
+def build_anchor_index(file_paths: Iterable[str], jobs: int = 1) -> Dict[str, Set[str]]:
+    """
+    为多个文件构建锚点索引，每个文件只读取和解析一次，未变化的文件直接使用磁盘缓存。
+
+    参数:
+        file_paths: 文件路径列表
+        jobs: 并行解析的进程数，0 表示使用全部 CPU 核心
+
+    返回:
+        {规范化文件路径: 锚点集合}，按输入顺序排列，不存在的文件不会出现在索引中
+    """
+    file_anchors = load_many_file_anchors((os.path.normpath(file_path) for file_path in file_paths), jobs)
+    flush_cache()
+    return {file_path: item.anchors for file_path, item in file_anchors.items()}
+
+
+def find_doc_files(root_dir: str) -> List[str]:
+    """
+    递归查找目录下所有 MDX/MD 文档，按路径排序返回。
+    """
+    doc_files = []
+    for dir_path, dir_names, file_names in os.walk(root_dir):
+        # 跳过隐藏目录和 node_modules
+        dir_names[:] = [d for d in dir_names if not d.startswith('.') and d != 'node_modules']
+        for file_name in file_names:
+            if file_name.lower().endswith(DOC_EXTENSIONS):
+                doc_files.append(os.path.normpath(os.path.join(dir_path, file_name)))
+    return sorted(doc_files)
+
+
+def parse_check_requests(lines: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    解析批量检查的输入，每行一个 (文件, 锚点)。
+    支持三种格式：
+    1. JSONL: {"file": "path/to/file.mdx", "anchor": "some-anchor"}
+    2. 文件路径和锚点以 Tab 或空白分隔: path/to/file.mdx some-anchor
+    3. 带井号的链接: path/to/file.mdx#some-anchor
+
+    返回: [(文件路径, 锚点), ...]，空行会被忽略
+    """
+    pairs = []
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            item = json.loads(line)
+            pairs.append((item.get('file') or item.get('path', ''), item.get('anchor', '')))
+        elif '\t' in line:
+            file_path, anchor = line.rsplit('\t', 1)
+            pairs.append((file_path.strip(), anchor.strip()))
+        elif len(line.split()) > 1:
+            file_path, anchor = line.rsplit(None, 1)
+            pairs.append((file_path.strip(), anchor))
+        else:
+            file_path, _, anchor = line.partition('#')
+            pairs.append((file_path, anchor))
+    return pairs
+
+
+def check_many(pairs: Iterable[Tuple[str, str]], jobs: int = 1) -> List[dict]:
+    """
+    批量检查锚点是否有效。同一个文件只会被解析一次。
+
+    参数:
+        pairs: [(文件路径, 锚点), ...]
+        jobs: 并行解析的进程数，0 表示使用全部 CPU 核心
+
+    返回:
+        [{"file": 文件路径, "anchor": 锚点, "valid": 是否有效}, ...]，顺序与输入一致
+    """
+    pairs = list(pairs)
+    index = build_anchor_index((file_path for file_path, _ in pairs), jobs)
+
+    results = []
+    for file_path, anchor in pairs:
+        valid = False
+        if is_anchor_name(anchor):
+            valid = anchor in index.get(os.path.normpath(file_path), ())
+        results.append({'file': file_path, 'anchor': anchor, 'valid': valid})
+    return results
+
+
+# 锚点推荐：文本规范化和 n-gram 切分
+_CAMEL_CASE_RE = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+_SUGGEST_SEPARATOR_RE = re.compile(r'[\W_]+')
+# 锚点推荐时先按 n-gram 相似度粗筛的候选数量，再计算编辑距离
+SUGGEST_PREFILTER_SIZE = 50
+
+
+def _normalize_for_suggest(text: str) -> str:
+    """拆分驼峰、转小写，并将标点、连字符和下划线统一为空格"""
+    text = _CAMEL_CASE_RE.sub(' ', text).lower()
+    return _SUGGEST_SEPARATOR_RE.sub(' ', text).strip()
+
+
+def _bigrams(text: str) -> Set[str]:
+    """切分字符二元组，首尾补空格以保留词首词尾信息，对中文标题同样适用"""
+    padded = f' {text} '
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def _edit_distance(a: str, b: str) -> int:
+    """Levenshtein 编辑距离"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class SuggestIndex:
+    """
+    文档锚点的推荐索引。
+
+    为每个候选锚点的锚点名和标题文字建立字符二元组倒排索引，查询时先按二元组 Dice 系数粗筛，
+    再结合编辑距离排序，结果稳定可复现。
+    """
+
+    def __init__(self, file_anchors: FileAnchors):
+        # 候选项 [(锚点, 标题, 行号), ...]，ParamField 锚点没有标题和行号
+        self.candidates = []
+        # 检索键 [(候选项下标, 规范化文本, 二元组集合), ...]
+        self.keys = []
+        # 倒排索引 {二元组: [检索键下标, ...]}
+        self.postings: Dict[str, List[int]] = {}
+
+        seen = set()
+        for title, anchor, line in file_anchors.headings:
+            if anchor not in seen:
+                seen.add(anchor)
+                self._add(anchor, title, line)
+        for anchor in file_anchors.param_anchors:
+            if anchor not in seen:
+                seen.add(anchor)
+                self._add(anchor, '', 0)
+
+    def _add(self, anchor: str, title: str, line: int):
+        candidate_id = len(self.candidates)
+        self.candidates.append((anchor, title, line))
+        texts = {_normalize_for_suggest(anchor), _normalize_for_suggest(title)}
+        for text in sorted(texts):
+            if not text:
+                continue
+            grams = _bigrams(text)
+            key_id = len(self.keys)
+            self.keys.append((candidate_id, text, grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(key_id)
+
+    def suggest(self, query: str, top_k: int = 5) -> List[dict]:
+        """
+        查找与 query 最接近的锚点。
+
+        参数:
+            query: 锚点名或标题文字
+            top_k: 返回的候选数量
+
+        返回:
+            [{"anchor": 锚点, "title": 标题, "line": 行号, "score": 相似度}, ...]，按相似度从高到低排列
+        """
+        query_text = _normalize_for_suggest(query)
+        if not query_text or not self.keys:
+            return []
+        query_grams = _bigrams(query_text)
+
+        # 1. 通过倒排索引统计共有的二元组数量，计算 Dice 系数
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for key_id in self.postings.get(gram, ()):
+                shared[key_id] = shared.get(key_id, 0) + 1
+        dice = {
+            key_id: 2 * count / (len(query_grams) + len(self.keys[key_id][2]))
+            for key_id, count in shared.items()
+        }
+
+        # 2. 粗筛后结合编辑距离打分；没有任何共有二元组时对全部候选计算编辑距离
+        if dice:
+            key_ids = sorted(dice, key=lambda key_id: (-dice[key_id], key_id))[:SUGGEST_PREFILTER_SIZE]
+        else:
+            key_ids = range(len(self.keys))
+
+        scores = self._score(query_text, key_ids, dice)
+
+        # 3. 粗筛结果不足 top_k 个时，其余锚点也按编辑距离打分，与粗筛结果一起排序
+        if len(scores) < top_k:
+            rest = [key_id for key_id in range(len(self.keys)) if self.keys[key_id][0] not in scores]
+            scores.update(self._score(query_text, rest, dice))
+
+        # 按分数从高到低排列，同分时按行号、锚点名排序
+        ranked = sorted(scores, key=lambda candidate_id: (
+            -scores[candidate_id], self.candidates[candidate_id][2], self.candidates[candidate_id][0],
+        ))
+        results = []
+        for candidate_id in ranked[:top_k]:
+            anchor, title, line = self.candidates[candidate_id]
+            results.append({'anchor': anchor, 'title': title, 'line': line, 'score': scores[candidate_id]})
+        return results
+
+    def _score(self, query_text: str, key_ids, dice: Dict[int, float]) -> Dict[int, float]:
+        """按 Dice 系数和编辑距离为检索键打分，返回 {候选项下标: 最高分}。"""
+        scores: Dict[int, float] = {}
+        for key_id in key_ids:
+            candidate_id, text, _ = self.keys[key_id]
+            similarity = 1 - _edit_distance(query_text, text) / max(len(query_text), len(text))
+            score = round(0.5 * dice.get(key_id, 0.0) + 0.5 * similarity, 4)
+            if score > scores.get(candidate_id, -1.0):
+                scores[candidate_id] = score
+        return scores
+
+
+# 推荐索引缓存 {文件绝对路径: (FileAnchors, SuggestIndex)}，文件变化后 FileAnchors 会被替换
+_suggest_indexes: Dict[str, Tuple[FileAnchors, SuggestIndex]] = {}
+
+
+def suggest_anchors(mdx_file_path: str, anchor: str, top_k: int = 5) -> List[dict]:
+    """
+    锚点无效时，推荐文档中最接近的锚点。
+
+    参数:
+        mdx_file_path: MDX 文件路径
+        anchor: 无效的锚点名（也可以是标题文字）
+        top_k: 返回的候选数量
+
+    返回:
+        [{"anchor": 锚点, "title": 标题, "line": 行号, "score": 相似度}, ...]，文件不存在时返回空列表
+    """
+    file_anchors = load_file_anchors(mdx_file_path)
+    if file_anchors is None:
+        return []
+
+    key = os.path.abspath(mdx_file_path)
+    cached = _suggest_indexes.get(key)
+    if cached is None or cached[0] is not file_anchors:
+        cached = (file_anchors, SuggestIndex(file_anchors))
+        _suggest_indexes[key] = cached
+    return cached[1].suggest(anchor, top_k)
 
 
 def add_anchor_to_file(mdx_file_path: str, title: str, anchor_name: str) -> bool:
@@ -248,46 +878,335 @@ def add_anchor_to_file(mdx_file_path: str, title: str, anchor_name: str) -> bool
     返回:
         True 如果成功添加或已存在，False 否则
     """
+    result = add_anchors_to_file(mdx_file_path, [(title, anchor_name)])
+    return result is not None and not result['not_found']
+
+
+def parse_generate_requests(lines: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    解析批量生成锚点的输入，每行一个 (标题, 锚点名)。
+    支持两种格式：
+    1. JSONL: {"title": "标题文本", "anchor": "anchor-name"}
+    2. 标题和锚点名以 Tab 分隔（标题中可能含空格，因此不支持空白分隔）
+
+    返回: [(标题, 锚点名), ...]，空行会被忽略
+    """
+    pairs = []
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line.startswith('{'):
+            item = json.loads(line)
+            pairs.append((item.get('title', ''), item.get('anchor', '')))
+        else:
+            title, _, anchor = line.rpartition('\t')
+            pairs.append((title.strip(), anchor.strip()))
+    return pairs
+
+
+def _write_file_atomic(file_path: str, content: str):
+    """先写入同目录下的临时文件，再通过 rename 替换原文件，中途失败不会留下写了一半的文件"""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(file_path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def add_anchors_to_file(mdx_file_path: str, pairs: Iterable[Tuple[str, str]]) -> Optional[dict]:
+    """
+    在文件中批量为标题添加锚点定义，只扫描一遍文件，并且只原子地写入一次。
+
+    与 add_anchor_to_file 的规则一致：每个标题匹配第一个文字相同的 heading 行，
+    该行已有锚点时视为已存在，不会重复添加。
+
+    参数:
+        mdx_file_path: MDX 文件路径
+        pairs: [(标题, 锚点名), ...]
+
+    返回:
+        {"added": [...], "existing": [...], "not_found": [...]}，每项为 {"title": 标题, "anchor": 锚点名}；
+        文件不存在时返回 None
+    """
     if not os.path.exists(mdx_file_path):
-        return False
+        return None
+
+    # 同一个标题出现多次时，第一次添加锚点，之后的请求视为已存在
+    pending: Dict[str, List[str]] = {}
+    for title, anchor_name in pairs:
+        pending.setdefault(title, []).append(anchor_name)
+    report = {'added': [], 'existing': [], 'not_found': []}
 
     with open(mdx_file_path, 'r', encoding='utf-8') as f:
         content = f.read()
 
     lines = content.split('\n')
-
     for i, line in enumerate(lines):
-        # 查找匹配的标题行（支持标题后已有锚点标签）
-        match = re.match(r'^(#{1,6})\s+' + re.escape(title) + r'(?:\s*<a\s+id=["\'][^"\']*["\']\s*/>)?\s*$', line)
-        if match:
-            # 检查行内是否已有锚点
-            if '<a id=' in line:
-                return True  # 已存在，不需要添加
-
-            # 在标题行末尾添加锚点
-            anchor_tag = f' <a id="{anchor_name}" />'
-            lines[i] = line.rstrip() + anchor_tag
-
-            # 写回文件
-            with open(mdx_file_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(lines))
-            return True
+        if not pending:
+            break
+        match = _HEADING_RE.match(line)
+        if not match:
+            continue
+        # 支持标题后已有锚点标签
+        text = match.group(2).rstrip()
+        title = text if text in pending else _TRAILING_ANCHOR_RE.sub('', text)
+        anchor_names = pending.pop(title, None)
+        if anchor_names is None:
+            continue
+
+        if '<a id=' in line:
+            report['existing'].extend({'title': title, 'anchor': name} for name in anchor_names)
+            continue
+        # 在标题行末尾添加锚点
+        lines[i] = line.rstrip() + f' <a id="{anchor_names[0]}" />'
+        report['added'].append({'title': title, 'anchor': anchor_names[0]})
+        report['existing'].extend({'title': title, 'anchor': name} for name in anchor_names[1:])
+
+    for title, anchor_names in pending.items():
+        report['not_found'].extend({'title': title, 'anchor': name} for name in anchor_names)
 
-    return False  # 没找到匹配的标题
+    if report['added']:
+        _write_file_atomic(mdx_file_path, '\n'.join(lines))
+    return report
+
+
+def _get_socket_path() -> str:
+    """
+    获取常驻服务的 socket 路径。
+    优先使用环境变量 ANCHOR_HELPER_SOCKET，否则使用 workspace/.tmp/anchor_helper.sock
+    """
+    socket_path = os.environ.get('ANCHOR_HELPER_SOCKET')
+    if socket_path:
+        return socket_path
+    workspace_root = os.environ.get('CLAUDE_CODE_WORKSPACE') or os.getcwd()
+    return os.path.join(workspace_root, '.tmp', SOCKET_FILE_NAME)
+
+
+# 常驻服务支持的方法，参数中的文件路径应为绝对路径
+DAEMON_METHODS = {
+    'ping': lambda params: True,
+    'check': lambda params: is_valid_anchor(params['file'], params['anchor']),
+    'headings': lambda params: get_all_headings(params['file']),
+    'generate': lambda params: add_anchor_to_file(params['file'], params['title'], params['anchor']),
+    'check_many': lambda params: check_many([(item['file'], item['anchor']) for item in params['items']]),
+    'generate_many': lambda params: add_anchors_to_file(
+        params['file'], [(item['title'], item['anchor']) for item in params['items']]),
+    'suggest': lambda params: suggest_anchors(params['file'], params['anchor'], params.get('top_k', 5)),
+}
+
+
+def handle_request(request: dict) -> dict:
+    """
+    处理一个 JSON-RPC 请求。
+
+    参数:
+        request: {"id": 请求ID, "method": 方法名, "params": {...}}
+
+    返回:
+        {"id": 请求ID, "result": 结果} 或 {"id": 请求ID, "error": {"code": 错误码, "message": 错误信息}}
+    """
+    response = {'jsonrpc': '2.0', 'id': request.get('id')}
+    method = DAEMON_METHODS.get(request.get('method'))
+    if method is None:
+        response['error'] = {'code': -32601, 'message': f'未知方法: {request.get("method")}'}
+        return response
+    try:
+        response['result'] = method(request.get('params') or {})
+    except (KeyError, TypeError) as e:
+        response['error'] = {'code': -32602, 'message': f'参数错误: {e}'}
+    except Exception as e:
+        response['error'] = {'code': -32000, 'message': str(e)}
+    flush_cache()
+    return response
+
+
+def _handle_stream(reader, writer, lock: Optional[threading.Lock] = None) -> bool:
+    """
+    逐行读取请求并写回响应，直到输入结束。
+
+    参数:
+        reader: 请求输入流
+        writer: 响应输出流
+        lock: 处理请求时持有的锁，多个连接并发时用于串行访问缓存
+
+    返回:
+        是否收到 shutdown 请求
+    """
+    for line in reader:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': f'JSON 解析失败: {e}'}}
+        else:
+            if request.get('method') == 'shutdown':
+                writer.write(json.dumps({'jsonrpc': '2.0', 'id': request.get('id'), 'result': True}) + '\n')
+                writer.flush()
+                return True
+            with lock or nullcontext():
+                response = handle_request(request)
+        writer.write(json.dumps(response, ensure_ascii=False) + '\n')
+        writer.flush()
+    return False
+
+
+def serve_stdio():
+    """以 stdio JSON-RPC 方式提供服务：每行一个请求，每行一个响应"""
+    _handle_stream(sys.stdin, sys.stdout)
+
+
+def serve_socket(socket_path: Optional[str] = None, poll_interval: float = DAEMON_POLL_INTERVAL) -> bool:
+    """
+    以 Unix socket 方式启动常驻服务，锚点索引常驻内存。
+    空闲时每隔 poll_interval 秒检查已加载的文件，文件变化后立即重新解析。
+    每个连接在单独的线程中读取请求，请求的处理串行进行；连接超过 DAEMON_CONNECTION_TIMEOUT 秒
+    没有发来完整的请求行时断开，不会阻塞其他客户端。
+
+    参数:
+        socket_path: socket 路径，默认为 workspace/.tmp/anchor_helper.sock
+        poll_interval: 检查文件变化的间隔（秒）
+
+    返回:
+        False 如果已有服务在运行或当前平台不支持 Unix socket
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        print('错误: 当前平台不支持 Unix socket，请使用 serve --stdio', file=sys.stderr)
+        return False
+
+    socket_path = socket_path or _get_socket_path()
+    if os.path.exists(socket_path):
+        handled, _ = call_daemon('ping', {}, socket_path)
+        if handled:
+            print(f'错误: 常驻服务已在运行: {socket_path}', file=sys.stderr)
+            return False
+        # 上次异常退出残留的 socket 文件
+        os.unlink(socket_path)
+
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    print(f'常驻服务已启动: {socket_path}', file=sys.stderr)
+
+    # 请求处理和文件变化检查共用一把锁；收到 shutdown 的线程通过 wake_writer 唤醒主循环
+    lock = threading.Lock()
+    stop = threading.Event()
+    wake_reader, wake_writer = socket.socketpair()
+
+    def serve_connection(conn: socket.socket):
+        try:
+            with conn, conn.makefile('r', encoding='utf-8') as reader, \
+                    conn.makefile('w', encoding='utf-8') as writer:
+                if _handle_stream(reader, writer, lock):
+                    stop.set()
+                    wake_writer.send(b'\0')
+        except (OSError, ValueError):
+            # 连接超时、客户端提前断开或发来的内容不是 UTF-8
+            pass
+
+    try:
+        while not stop.is_set():
+            readable, _, _ = select.select([server, wake_reader], [], [], poll_interval)
+            if not readable:
+                with lock:
+                    refresh_memory_cache()
+                continue
+            if server in readable:
+                conn, _ = server.accept()
+                conn.settimeout(DAEMON_CONNECTION_TIMEOUT)
+                threading.Thread(target=serve_connection, args=(conn,), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        wake_reader.close()
+        wake_writer.close()
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        flush_cache()
+    return True
+
+
+def call_daemon(method: str, params: dict, socket_path: Optional[str] = None) -> Tuple[bool, object]:
+    """
+    调用常驻服务。服务未运行、被禁用（ANCHOR_HELPER_DAEMON=off）或调用失败时返回 (False, None)，
+    调用方应回退到在当前进程中处理。
+
+    参数:
+        method: 方法名
+        params: 参数，其中的文件路径应为绝对路径
+        socket_path: socket 路径，默认为 workspace/.tmp/anchor_helper.sock
+
+    返回:
+        (是否由常驻服务处理, 结果)
+    """
+    if os.environ.get('ANCHOR_HELPER_DAEMON', '').lower() in ('off', '0', 'false'):
+        return False, None
+    if not hasattr(socket, 'AF_UNIX'):
+        return False, None
+    socket_path = socket_path or _get_socket_path()
+    if not os.path.exists(socket_path):
+        return False, None
+
+    request = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}, ensure_ascii=False)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(60)
+            client.connect(socket_path)
+            client.sendall(request.encode('utf-8') + b'\n')
+            client.shutdown(socket.SHUT_WR)
+            with client.makefile('r', encoding='utf-8') as reader:
+                response = json.loads(reader.readline())
+    except (OSError, ValueError):
+        return False, None
+
+    if 'error' in response:
+        return False, None
+    return True, response.get('result')
 
 
 # CLI 接口
 if __name__ == '__main__':
+    # 通用选项: --jobs N，批量模式下并行解析的进程数（0 表示使用全部 CPU 核心）
+    jobs = 1
+    if '--jobs' in sys.argv:
+        option_pos = sys.argv.index('--jobs')
+        option_value = sys.argv[option_pos + 1] if option_pos + 1 < len(sys.argv) else ''
+        if not (option_value.isascii() and option_value.isdigit()):
+            print('错误: --jobs 需要一个非负整数')
+            print('用法: python anchor_helper.py check-many|index ... --jobs N（0 表示使用全部 CPU 核心）')
+            sys.exit(1)
+        jobs = int(option_value)
+        del sys.argv[option_pos:option_pos + 2]
+
     if len(sys.argv) < 2:
         print('用法:')
         print('  检查锚点: python anchor_helper.py check <文件路径> <锚点名>')
         print('  生成锚点: python anchor_helper.py generate <文件路径> <标题> <锚点名>')
+        print('  批量生成: python anchor_helper.py generate-many <文件路径> [JSONL文件]（每行 {"title": 标题, "anchor": 锚点名}，不提供文件时从标准输入读取）')
         print('  获取标题: python anchor_helper.py headings <文件路径>')
+        print('  推荐锚点: python anchor_helper.py suggest <文件路径> <锚点名> [数量]')
+        print('  批量检查: python anchor_helper.py check-many [JSONL文件] [--jobs N]（不提供文件时从标准输入读取）')
+        print('  构建索引: python anchor_helper.py index <目录> [--jobs N]')
+        print('  常驻服务: python anchor_helper.py serve [--stdio]（启动后 check/generate/generate-many/headings/suggest/check-many 自动使用常驻服务）')
+        print('  停止服务: python anchor_helper.py stop')
         print('')
         print('示例:')
         print('  python anchor_helper.py check path/to/file.mdx document-structure-check')
         print('  python anchor_helper.py generate path/to/file.mdx "文档结构检查" document-structure-check')
+        print('  echo \'{"title": "文档结构检查", "anchor": "document-structure-check"}\' | python anchor_helper.py generate-many path/to/file.mdx')
         print('  python anchor_helper.py headings path/to/file.mdx')
+        print('  python anchor_helper.py suggest path/to/file.mdx document-structure-chek 5')
+        print('  echo \'{"file": "path/to/file.mdx", "anchor": "document-structure-check"}\' | python anchor_helper.py check-many')
+        print('  python anchor_helper.py index path/to/docs --jobs 8')
         sys.exit(1)
 
     action = sys.argv[1]
@@ -299,7 +1218,9 @@ if __name__ == '__main__':
             sys.exit(1)
         file_path = sys.argv[2]
         anchor_name = sys.argv[3]
-        result = is_valid_anchor(file_path, anchor_name)
+        handled, result = call_daemon('check', {'file': os.path.abspath(file_path), 'anchor': anchor_name})
+        if not handled:
+            result = is_valid_anchor(file_path, anchor_name)
         print('Valid' if result else 'Invalid')
         sys.exit(0 if result else 1)
 
@@ -311,7 +1232,9 @@ if __name__ == '__main__':
         file_path = sys.argv[2]
         title = sys.argv[3]
         anchor_name = sys.argv[4]
-        result = add_anchor_to_file(file_path, title, anchor_name)
+        handled, result = call_daemon('generate', {'file': os.path.abspath(file_path), 'title': title, 'anchor': anchor_name})
+        if not handled:
+            result = add_anchor_to_file(file_path, title, anchor_name)
         if result:
             print(f'成功添加锚点: {anchor_name}')
             sys.exit(0)
@@ -319,18 +1242,100 @@ if __name__ == '__main__':
             print(f'失败: 未找到标题 "{title}" 或文件不存在')
             sys.exit(1)
 
+    elif action == 'generate-many':
+        # 一次写入文件的全部锚点，输出 JSON 报告，有未找到的标题时退出码为 1
+        if len(sys.argv) < 3:
+            print('错误: generate-many 模式需要文件路径')
+            print('用法: python anchor_helper.py generate-many <文件路径> [请求文件|-]')
+            sys.exit(1)
+        file_path = sys.argv[2]
+        source = sys.argv[3] if len(sys.argv) > 3 else '-'
+        if source == '-':
+            generate_requests = parse_generate_requests(sys.stdin)
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                generate_requests = parse_generate_requests(f)
+        handled, report = call_daemon('generate_many', {
+            'file': os.path.abspath(file_path),
+            'items': [{'title': title, 'anchor': anchor} for title, anchor in generate_requests],
+        })
+        if not handled:
+            report = add_anchors_to_file(file_path, generate_requests)
+        if report is None:
+            print(f'失败: 文件不存在 {file_path}')
+            sys.exit(1)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        sys.exit(1 if report['not_found'] else 0)
+
     elif action == 'headings':
         if len(sys.argv) < 3:
             print('错误: headings 模式需要文件路径')
             print('用法: python anchor_helper.py headings <文件路径>')
             sys.exit(1)
         file_path = sys.argv[2]
-        headings = get_all_headings(file_path)
-        import json
+        handled, headings = call_daemon('headings', {'file': os.path.abspath(file_path)})
+        if not handled:
+            headings = get_all_headings(file_path)
         print(json.dumps(headings, ensure_ascii=False, indent=2))
         sys.exit(0)
 
+    elif action == 'suggest':
+        if len(sys.argv) < 4:
+            print('错误: suggest 模式需要文件路径和锚点名')
+            print('用法: python anchor_helper.py suggest <文件路径> <锚点名> [数量]')
+            sys.exit(1)
+        file_path = sys.argv[2]
+        anchor_name = sys.argv[3]
+        top_k = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+        handled, suggestions = call_daemon('suggest', {'file': os.path.abspath(file_path), 'anchor': anchor_name, 'top_k': top_k})
+        if not handled:
+            suggestions = suggest_anchors(file_path, anchor_name, top_k)
+        print(json.dumps(suggestions, ensure_ascii=False, indent=2))
+        sys.exit(0)
+
+    elif action == 'check-many':
+        # 每行输出一个 JSON 结果，全部有效时退出码为 0
+        source = sys.argv[2] if len(sys.argv) > 2 else '-'
+        if source == '-':
+            check_requests = parse_check_requests(sys.stdin)
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                check_requests = parse_check_requests(f)
+        handled, results = call_daemon('check_many', {
+            'items': [{'file': os.path.abspath(file_path), 'anchor': anchor} for file_path, anchor in check_requests]
+        })
+        if handled:
+            # 输出中保留输入的文件路径
+            for item, (file_path, _) in zip(results, check_requests):
+                item['file'] = file_path
+        else:
+            results = check_many(check_requests, jobs)
+        for item in results:
+            print(json.dumps(item, ensure_ascii=False))
+        sys.exit(0 if all(item['valid'] for item in results) else 1)
+
+    elif action == 'index':
+        if len(sys.argv) < 3:
+            print('错误: index 模式需要目录路径')
+            print('用法: python anchor_helper.py index <目录>')
+            sys.exit(1)
+        index = build_anchor_index(find_doc_files(sys.argv[2]), jobs)
+        print(json.dumps({path: sorted(anchors) for path, anchors in index.items()}, ensure_ascii=False, indent=2))
+        sys.exit(0)
+
+    elif action == 'serve':
+        # 常驻服务：默认监听 Unix socket，--stdio 时使用标准输入输出
+        if '--stdio' in sys.argv[2:]:
+            serve_stdio()
+            sys.exit(0)
+        sys.exit(0 if serve_socket() else 1)
+
+    elif action == 'stop':
+        handled, _ = call_daemon('shutdown', {})
+        print('常驻服务已停止' if handled else '常驻服务未运行')
+        sys.exit(0)
+
     else:
         print(f'错误: 未知操作 "{action}"')
-        print('支持的操作: check, generate, headings')
+        print('支持的操作: check, generate, generate-many, headings, suggest, check-many, index, serve, stop')
         sys.exit(1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+anchor_helper.py 解析性能基准。
+
+生成一个包含大量标题（每个标题前后各有空行，每三个标题带一个独立的 <a id> 锚点行）
+和 ParamField 组件（每个带约 900 字符的正文）的文档，分别测量标题扫描和 ParamField
+提取的耗时。
+
+用法:
+    python bench_anchor_helper.py
+    python bench_anchor_helper.py --headings 10000 --repeat 5
+    # 与旧版本对比，例如:
+    git show <提交>:plugins/zego-doc-writer/skills/link-check/scripts/anchor_helper.py > /tmp/anchor_helper_old.py
+    python bench_anchor_helper.py --baseline /tmp/anchor_helper_old.py
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib.util
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import anchor_helper  # noqa: E402
+
+
+def build_document(headings: int) -> str:
+    """
+    生成测试文档。
+
+    参数:
+        headings: 标题数量，ParamField 组件数量与之相同
+
+    返回:
+        文档内容
+    """
+    body = '参数说明。' * 60 + '\n' + 'x' * 600
+    lines = []
+    for i in range(headings):
+        if i % 3 == 0:
+            lines.append(f'<a id="api-{i}" />')
+        lines += [''] * 5
+        if i % 7 == 0:
+            lines.append(f'### method{i}:withArg: <ParamField>')
+        else:
+            lines.append(f'## Method {i} Publish Stream Config')
+        lines += [''] * 5
+        lines.append(f'<ParamField name="method{i}:withArg:" parent_name="ZegoExpressEngine" '
+                     f'anchor_suffix="-{i}" type="void">')
+        lines.append(body)
+        lines.append('</ParamField>')
+    return '\n'.join(lines)
+
+
+def load_module(path: str):
+    """按文件路径加载另一个版本的 anchor_helper 作为对比基准"""
+    spec = importlib.util.spec_from_file_location('anchor_helper_baseline', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(func, content: str, repeat: int) -> float:
+    """返回 repeat 次运行耗时的中位数（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量 anchor_helper 标题扫描和 ParamField 提取的耗时')
+    parser.add_argument('--headings', type=int, default=10000, help='生成的标题数量（默认 10000）')
+    parser.add_argument('--repeat', type=int, default=5, help='每项测量的重复次数，取中位数（默认 5）')
+    parser.add_argument('--baseline', help='作为对比基准的另一个 anchor_helper.py 路径')
+    args = parser.parse_args()
+
+    content = build_document(args.headings)
+    print(f'文档: {args.headings} 个标题，{len(content.encode("utf-8")) / 1024 / 1024:.1f} MB')
+
+    modules = [('当前', anchor_helper)]
+    if args.baseline:
+        modules.insert(0, ('基准', load_module(args.baseline)))
+
+    results = []
+    for label, module in modules:
+        headings = module.extract_headings_with_anchors(content)
+        param_fields = module.extract_param_fields(content)
+        results.append((headings, [field.get('name') for field in param_fields]))
+        print(f'{label}: 标题扫描 {measure(module.extract_headings_with_anchors, content, args.repeat):.1f} ms，'
+              f'ParamField 提取 {measure(module.extract_param_fields, content, args.repeat):.1f} ms')
+
+    if len(results) == 2 and results[0] != results[1]:
+        print('警告: 两个版本的解析结果不一致', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,590 @@
+"""
+一次性检查整个实例目录（或多个目录/文件）中的所有链接。
+
+遍历目录下所有 MDX/MD 文档，提取各类链接构建链接图（源文件 → 目标文件#锚点），
+再基于预先构建的文件和锚点索引统一校验，输出机器可读的 JSON 报告。
+
+支持的链接类型：
+- MD 格式链接 [文本](链接地址)、图片 ![文本](地址) 和引用式链接定义 [ref]: 地址
+- HTML a 标签链接 <a href="链接地址">
+- 组件链接 <Card href="链接地址">、<Button href="链接地址"> 等
+- 纯文本链接 http://xxx 或 https://xxx
+- MDX 导入语句 import xxx from 'path'
+
+用法:
+    python link_graph.py <实例目录或文件> [...] [--config-helper 路径] [--slug-map 文件] [--output 文件] [--jobs N]
+    python link_graph.py <实例目录> --since origin/main...HEAD    # 增量检查
+    python link_graph.py <实例目录> --changed path/to/a.mdx path/to/b.mdx
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+import argparse
+import subprocess
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from anchor_helper import DOC_EXTENSIONS, build_anchor_index, find_doc_files, flush_cache, is_anchor_name, load_many_cached
+
+# 默认的站内链接解析脚本（相对 workspace 根目录）
+DEFAULT_CONFIG_HELPER = os.path.join('.docuo', 'scripts', 'config_helper.py')
+
+# 中英文链接混用检查：文档语言 -> 禁止出现的域名后缀
+FORBIDDEN_DOMAINS = {
+    'zh': ('zegocloud.com',),
+    'en': ('zego.im',),
+}
+# 可下载资源文件不受中英文混用限制，网页类后缀除外
+PAGE_EXTENSIONS = ('', '.html', '.htm', '.md', '.mdx', '.php', '.aspx')
+
+# 代码块和行内代码中的链接不检查
+_FENCE_RE = re.compile(r'^[ \t]*(`{3,}|~{3,})[^\n]*\n.*?^[ \t]*\1[ \t]*$', re.M | re.S)
+_INLINE_CODE_RE = re.compile(r'`[^`\n]+`')
+
+# 各类链接的匹配模式，第一个分组为链接地址
+_MARKDOWN_LINK_RE = re.compile(r'!?\[[^\]]*\]\(\s*<?([^\s)>]+)')
+# 链接文字中嵌套了图片或链接的外层链接，如徽章 [![img](a.png)](b.mdx)；内层链接由 _MARKDOWN_LINK_RE 匹配
+_NESTED_MARKDOWN_LINK_RE = re.compile(r'\[[^\[\]]*\[[^\[\]]*\][^\[\]]*\]\(\s*<?([^\s)>]+)')
+_MARKDOWN_DEFINITION_RE = re.compile(r'^[ \t]*\[[^\]]+\]:[ \t]*<?([^\s>]+)', re.M)
+_HREF_RE = re.compile(
+    r'<(a|[A-Z][\w.]*)\b[^>]*?\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|\{\s*["\'`]([^"\'`]*)["\'`]\s*\})',
+    re.S,
+)
+_BARE_URL_RE = re.compile(r'https?://[^\s<>"\'`)\]}]+')
+_IMPORT_RE = re.compile(r'^[ \t]*import\s+(?:[^\'";]*?\s+from\s+)?["\']([^"\']+)["\']', re.M)
+
+# 带协议的链接，如 https:、mailto:
+_SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+# 纯文本链接末尾的标点不属于链接
+_URL_TRAILING_PUNCTUATION = '.,;:!?，。；：！？'
+
+
+class Link(NamedTuple):
+    """链接图中的一条边"""
+    # 源文件路径
+    source: str
+    # 链接所在行号
+    line: int
+    # 链接写法: markdown, html, component, url, import
+    kind: str
+    # 原始链接地址
+    url: str
+    # 链接目标类型: anchor（本页锚点）, relative（相对路径）, slug（站内链接）, external（外部链接）, other（其他，不检查）
+    target_type: str
+    # 目标文件路径（relative/anchor）或 slug（slug），其他类型为原始地址
+    target: str
+    # 锚点，没有则为空字符串
+    anchor: str
+
+
+def _blank_out(match: re.Match) -> str:
+    """将匹配内容替换为等长空白，保留换行以保证行号不变"""
+    return re.sub(r'[^\n]', ' ', match.group(0))
+
+
+def extract_links(content: str) -> List[Tuple[int, str, str]]:
+    """
+    提取文档中所有链接。
+
+    参数:
+        content: 文档内容
+
+    返回:
+        [(行号, 链接写法, 链接地址), ...]，按出现位置排序
+    """
+    content = _FENCE_RE.sub(_blank_out, content)
+    content = _INLINE_CODE_RE.sub(_blank_out, content)
+
+    line_starts = [0]
+    for match in re.finditer('\n', content):
+        line_starts.append(match.end())
+
+    found = []
+    # 已作为其他写法提取的链接起始位置，纯文本链接中需排除
+    covered = set()
+
+    for match in _MARKDOWN_LINK_RE.finditer(content):
+        found.append((match.start(1), 'markdown', match.group(1)))
+        covered.add(match.start(1))
+    for match in _NESTED_MARKDOWN_LINK_RE.finditer(content):
+        if match.start(1) not in covered:
+            found.append((match.start(1), 'markdown', match.group(1)))
+            covered.add(match.start(1))
+    for match in _MARKDOWN_DEFINITION_RE.finditer(content):
+        found.append((match.start(1), 'markdown', match.group(1)))
+        covered.add(match.start(1))
+    for match in _HREF_RE.finditer(content):
+        group = next(g for g in (2, 3, 4) if match.group(g) is not None)
+        kind = 'html' if match.group(1) == 'a' else 'component'
+        found.append((match.start(group), kind, match.group(group)))
+        covered.add(match.start(group))
+    for match in _IMPORT_RE.finditer(content):
+        found.append((match.start(1), 'import', match.group(1)))
+        covered.add(match.start(1))
+    for match in _BARE_URL_RE.finditer(content):
+        if match.start() not in covered:
+            found.append((match.start(), 'url', match.group(0).rstrip(_URL_TRAILING_PUNCTUATION)))
+
+    found.sort()
+    return [(bisect.bisect_right(line_starts, offset), kind, url.strip()) for offset, kind, url in found if url.strip()]
+
+
+def classify_link(source: str, kind: str, url: str) -> Tuple[str, str, str]:
+    """
+    判断链接目标类型并解析目标。
+
+    参数:
+        source: 源文件路径
+        kind: 链接写法
+        url: 链接地址
+
+    返回:
+        (目标类型, 目标, 锚点)
+    """
+    if url.startswith(('http://', 'https://')):
+        return 'external', url, ''
+    if _SCHEME_RE.match(url) or url.startswith(('//', '{')):
+        # mailto:、tel:、协议相对地址和 JSX 表达式不检查
+        return 'other', url, ''
+
+    path, _, anchor = url.partition('#')
+    path = path.split('?', 1)[0]
+    if '%' in url:
+        path = unquote(path)
+        anchor = unquote(anchor)
+
+    if not path:
+        return 'anchor', source, anchor
+    if path.startswith('/'):
+        if kind == 'import':
+            return 'other', url, ''
+        return 'slug', path, anchor
+    if kind == 'import' and not path.startswith('.'):
+        # 包导入（如 @site/xxx、react）不检查
+        return 'other', url, ''
+    return 'relative', os.path.normpath(os.path.join(os.path.dirname(source), path)), anchor
+
+
+def extract_file_links(file_path: str) -> List[Tuple[int, str, str]]:
+    """
+    提取单个文档中的所有链接。
+
+    参数:
+        file_path: 文档路径
+
+    返回:
+        [(行号, 链接写法, 链接地址), ...]
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return extract_links(f.read())
+
+
+def parse_doc_links(file_path: str) -> List[Link]:
+    """
+    解析单个文档中的所有链接。
+
+    参数:
+        file_path: 文档路径
+
+    返回:
+        Link 列表
+    """
+    return _to_links(file_path, extract_file_links(file_path))
+
+
+def _to_links(file_path: str, raw_links: Iterable) -> List[Link]:
+    """为提取出的 (行号, 链接写法, 链接地址) 解析目标，生成 Link 列表"""
+    links = []
+    for line, kind, url in raw_links:
+        target_type, target, anchor = classify_link(file_path, kind, url)
+        links.append(Link(file_path, line, kind, url, target_type, target, anchor))
+    return links
+
+
+def load_raw_links(paths: Iterable[str], jobs: int = 1) -> Dict[str, List[Tuple[int, str, str]]]:
+    """
+    遍历目录（或文件），提取所有文档中的链接（不解析目标）。
+    每个文档提取出的链接会写入磁盘缓存（与锚点缓存共用），未变化的文档无需重新解析。
+
+    参数:
+        paths: 目录或文件路径列表
+        jobs: 并行解析的进程数，0 表示使用全部 CPU 核心
+
+    返回:
+        {源文件路径: [(行号, 链接写法, 链接地址), ...]}，按源文件路径排序
+    """
+    doc_files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            doc_files.update(find_doc_files(path))
+        elif os.path.isfile(path):
+            doc_files.add(os.path.normpath(path))
+
+    raw_links = load_many_cached('links', sorted(doc_files), extract_file_links, lambda data: data, jobs)
+    flush_cache()
+    return raw_links
+
+
+def build_link_graph(paths: Iterable[str], jobs: int = 1) -> Dict[str, List[Link]]:
+    """
+    遍历目录（或文件）构建链接图。
+
+    参数:
+        paths: 目录或文件路径列表
+        jobs: 并行解析的进程数，0 表示使用全部 CPU 核心
+
+    返回:
+        {源文件路径: [Link, ...]}，按源文件路径排序
+    """
+    return {file_path: _to_links(file_path, items) for file_path, items in load_raw_links(paths, jobs).items()}
+
+
+def resolve_file(path: str) -> Optional[str]:
+    """
+    解析相对链接的目标文件，支持省略 .mdx/.md 后缀。
+
+    返回:
+        存在的文件路径，不存在时返回 None
+    """
+    if os.path.isfile(path):
+        return path
+    for ext in DOC_EXTENSIONS:
+        if os.path.isfile(path + ext):
+            return path + ext
+    return None
+
+
+def detect_doc_language(file_path: str) -> str:
+    """根据文档路径判断文档语言，无语言标识时默认为中文"""
+    normalized = '/' + file_path.replace(os.sep, '/').lower()
+    if '/en/' in normalized:
+        return 'en'
+    return 'zh'
+
+
+def is_mixed_language_link(file_path: str, url: str) -> bool:
+    """
+    检查外部链接是否存在中英文混用：中文文档不应出现 zegocloud.com 域名，英文文档不应出现 zego.im 域名。
+    带文件后缀的可下载资源（如 .zip、.pdf）不受此限制。
+    """
+    forbidden = FORBIDDEN_DOMAINS[detect_doc_language(file_path)]
+    if not any(domain in url.lower() for domain in forbidden):
+        return False
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    if not any(host == domain or host.endswith('.' + domain) for domain in forbidden):
+        return False
+    return os.path.splitext(parsed.path)[1].lower() in PAGE_EXTENSIONS
+
+
+class SlugResolver:
+    """
+    站内链接（slug）解析器。
+
+    优先使用 slug 映射表，否则调用 config_helper.py --resolve-url 解析，
+    每个 slug 只解析一次。
+    """
+
+    def __init__(self, config_helper: Optional[str] = None, slug_map: Optional[Dict[str, str]] = None):
+        self.config_helper = config_helper
+        self.slug_map = dict(slug_map or {})
+        self._resolved = {}
+
+    @property
+    def available(self) -> bool:
+        """是否能够解析 slug"""
+        return bool(self.slug_map) or bool(self.config_helper and os.path.isfile(self.config_helper))
+
+    def resolve(self, slug: str) -> Optional[str]:
+        """
+        解析 slug 对应的文档路径。
+
+        返回:
+            文档路径，无法解析时返回 None
+        """
+        if slug in self._resolved:
+            return self._resolved[slug]
+
+        path = self.slug_map.get(slug) or self.slug_map.get(slug.rstrip('/'))
+        if path is None:
+            path = self._run_config_helper('--resolve-url', slug)
+
+        self._resolved[slug] = path
+        return path
+
+    def url_of(self, file_path: str) -> Optional[str]:
+        """
+        获取文档对应的站内链接（slug），用于反查指向该文档的站内链接。
+
+        返回:
+            slug，无法获取时返回 None
+        """
+        target = os.path.normpath(file_path)
+        for slug, path in self.slug_map.items():
+            if os.path.normpath(path) == target:
+                return slug
+        return self._run_config_helper(file_path, '--url')
+
+    def _run_config_helper(self, *args: str) -> Optional[str]:
+        """调用 config_helper.py，返回最后一行非空输出"""
+        if not self.config_helper or not os.path.isfile(self.config_helper):
+            return None
+        try:
+            result = subprocess.run(
+                [sys.executable, self.config_helper, *args],
+                capture_output=True, text=True, timeout=30,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+        if result.returncode != 0 or not lines:
+            return None
+        return lines[-1]
+
+
+def git_changed_files(revision: str) -> List[str]:
+    """
+    获取 git 版本范围内变化的文件（包括已删除的文件）。
+
+    参数:
+        revision: git 版本或版本范围，如 HEAD~1、origin/main...HEAD。
+            只提供单个版本时与工作区比较，并包含未跟踪的新文件
+
+    返回:
+        相对当前目录的文件路径列表
+    """
+    top_level = subprocess.run(
+        ['git', 'rev-parse', '--show-toplevel'], capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    # 在仓库根目录执行，输出的路径都相对仓库根目录；ls-files 在子目录中只会列出该目录下的文件。
+    # 使用 -z 输出，否则含中文等非 ASCII 字符的路径会被 git 加引号转义
+    changed = subprocess.run(
+        ['git', 'diff', '--name-only', '-z', revision], capture_output=True, text=True, check=True, cwd=top_level,
+    ).stdout.split('\0')
+    if '..' not in revision:
+        changed += subprocess.run(
+            ['git', 'ls-files', '--others', '--exclude-standard', '-z'],
+            capture_output=True, text=True, check=True, cwd=top_level,
+        ).stdout.split('\0')
+
+    return sorted({os.path.relpath(os.path.join(top_level, path)) for path in changed if path})
+
+
+def warn_unscanned_docs(changed_files: Iterable[str], raw_links: Dict[str, List[Tuple[int, str, str]]]):
+    """
+    变化的文档（仍存在的 .md/.mdx）不在扫描范围内时输出警告，
+    避免实例目录与变化文件不对应时增量检查静默地什么都不检查
+
+    参数:
+        changed_files: 变化的文件路径
+        raw_links: load_raw_links 返回的链接
+    """
+    scanned = {os.path.realpath(source) for source in raw_links}
+    unscanned = sorted({
+        os.path.normpath(path) for path in changed_files
+        if os.path.splitext(path)[1].lower() in DOC_EXTENSIONS and os.path.isfile(path)
+        and os.path.realpath(path) not in scanned
+    })
+    if unscanned:
+        shown = ', '.join(unscanned[:5]) + (' ...' if len(unscanned) > 5 else '')
+        print(f'警告: {len(unscanned)} 个变化的文档不在扫描范围内，不会检查其中的链接: {shown}', file=sys.stderr)
+
+
+def select_affected_links(raw_links: Dict[str, List[Tuple[int, str, str]]], changed_files: Iterable[str],
+                          slug_resolver: SlugResolver) -> Dict[str, List[Link]]:
+    """
+    增量检查：只保留源文件或目标文件发生变化的链接。
+
+    变化的源文件中的链接全部保留；其他文档中，只有链接地址包含变化文件名（或其 slug 末段）的链接
+    才会被解析目标，再通过反向依赖索引（目标 → 链接）精确匹配指向变化文件的链接：
+    相对链接按目标文件路径匹配，站内链接按变化文件对应的 slug 匹配。
+
+    参数:
+        raw_links: load_raw_links 返回的链接
+        changed_files: 变化的文件路径（可以包含已删除的文件）
+        slug_resolver: 站内链接解析器，用于获取变化文件的 slug
+
+    返回:
+        只包含受影响链接的链接图
+    """
+    changed_files = sorted({os.path.normpath(path) for path in changed_files})
+
+    # 变化文件可能的链接目标：文件路径（相对链接可省略 .mdx/.md 后缀）和 slug。
+    # 文件路径统一为 realpath 比较，实例目录和变化文件可以分别使用绝对路径和相对路径
+    changed_paths = set()
+    changed_slugs = set()
+    needles = set()
+    for file_path in changed_files:
+        root, ext = os.path.splitext(file_path)
+        changed_paths.add(os.path.realpath(file_path))
+        needles.add(os.path.basename(root))
+        if ext.lower() in DOC_EXTENSIONS:
+            changed_paths.add(os.path.realpath(root))
+            slug = slug_resolver.url_of(file_path)
+            if slug:
+                slug = urlparse(slug).path.rstrip('/')
+                changed_slugs.add(slug)
+                needles.add(slug.rsplit('/', 1)[-1])
+    needles.discard('')
+    needle_re = re.compile('|'.join(re.escape(needle) for needle in sorted(needles)) or r'(?!)')
+
+    graph = {}
+    # 反向依赖索引：目标 → 链接，相对链接的目标为 realpath，站内链接的目标为 slug
+    path_index: Dict[str, List[Link]] = {}
+    slug_index: Dict[str, List[Link]] = {}
+    for source, items in raw_links.items():
+        if os.path.realpath(source) in changed_paths:
+            # 源文件变化：重新检查该文件中的所有链接
+            graph[source] = _to_links(source, items)
+            continue
+        # 链接地址可能经过百分号编码（如 %E4%B8%AD.mdx），解码后再与文件名比较
+        candidates = [item for item in items if needle_re.search(unquote(item[2]))]
+        for link in _to_links(source, candidates):
+            if link.target_type == 'relative':
+                path_index.setdefault(os.path.realpath(link.target), []).append(link)
+            elif link.target_type == 'slug':
+                slug_index.setdefault(link.target.rstrip('/'), []).append(link)
+
+    # 目标文件变化：重新检查指向该文件的链接
+    for index, targets in ((path_index, changed_paths), (slug_index, changed_slugs)):
+        for target in sorted(targets):
+            for link in index.get(target, ()):
+                graph.setdefault(link.source, []).append(link)
+
+    return {source: sorted(links, key=lambda link: (link.line, link.url)) for source, links in sorted(graph.items())}
+
+
+def check_links(graph: Dict[str, List[Link]], slug_resolver: SlugResolver, jobs: int = 1) -> dict:
+    """
+    校验链接图中的所有链接。
+
+    参数:
+        graph: build_link_graph 返回的链接图
+        slug_resolver: 站内链接解析器
+        jobs: 构建锚点索引时并行解析的进程数
+
+    返回:
+        JSON 报告字典
+    """
+    # 1. 解析所有链接的目标文件，同一目标只检查一次
+    resolved = []
+    target_files = {}
+
+    def resolve_cached(path):
+        if path not in target_files:
+            target_files[path] = resolve_file(path)
+        return target_files[path]
+
+    for links in graph.values():
+        for link in links:
+            target_file = None
+            status = 'ok'
+            if link.target_type == 'external':
+                status = 'mixed_language' if is_mixed_language_link(link.source, link.url) else 'external'
+            elif link.target_type == 'other':
+                status = 'skipped'
+            elif link.target_type == 'slug':
+                if not slug_resolver.available:
+                    status = 'skipped'
+                else:
+                    target_file = slug_resolver.resolve(link.target)
+                    target_file = resolve_cached(target_file) if target_file else None
+                    if target_file is None:
+                        status = 'unresolved_slug'
+            else:
+                target_file = resolve_cached(link.target)
+                if target_file is None:
+                    status = 'missing_file'
+            resolved.append((link, target_file, status))
+
+    # 2. 为所有需要校验锚点的目标文件一次性构建锚点索引
+    anchor_targets = {
+        target_file for link, target_file, status in resolved
+        if status == 'ok' and link.anchor and target_file.lower().endswith(DOC_EXTENSIONS)
+    }
+    anchor_index = build_anchor_index(sorted(anchor_targets), jobs)
+
+    # 3. 校验锚点并汇总
+    summary = {}
+    problems = []
+    for link, target_file, status in resolved:
+        if status == 'ok' and link.anchor and target_file in anchor_index:
+            if not is_anchor_name(link.anchor) or link.anchor not in anchor_index[target_file]:
+                status = 'missing_anchor'
+        summary[status] = summary.get(status, 0) + 1
+        if status in ('missing_file', 'missing_anchor', 'unresolved_slug', 'mixed_language'):
+            problems.append({
+                'source': link.source,
+                'line': link.line,
+                'kind': link.kind,
+                'url': link.url,
+                'status': status,
+                'target': target_file or link.target,
+                'anchor': link.anchor,
+            })
+
+    return {
+        'files': len(graph),
+        'links': len(resolved),
+        'summary': dict(sorted(summary.items())),
+        'problems': problems,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='一次性检查目录下所有文档的链接')
+    parser.add_argument('paths', nargs='+', help='实例目录或文档路径')
+    parser.add_argument('--config-helper', default=DEFAULT_CONFIG_HELPER,
+                        help=f'站内链接解析脚本路径（默认 {DEFAULT_CONFIG_HELPER}）')
+    parser.add_argument('--slug-map', help='slug 到文档路径映射的 JSON 文件（可选，优先于 config_helper.py）')
+    parser.add_argument('--output', '-o', help='报告输出文件（默认输出到标准输出）')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='并行解析的进程数，0 表示使用全部 CPU 核心（默认 1）')
+    parser.add_argument('--changed', nargs='+', metavar='FILE',
+                        help='增量检查：只检查这些文件中的链接以及指向这些文件的链接')
+    parser.add_argument('--since', metavar='REV',
+                        help='增量检查：使用 git diff 获取变化的文件，如 HEAD~1 或 origin/main...HEAD')
+
+    args = parser.parse_args()
+
+    slug_map = None
+    if args.slug_map:
+        with open(args.slug_map, 'r', encoding='utf-8') as f:
+            slug_map = json.load(f)
+
+    slug_resolver = SlugResolver(args.config_helper, slug_map)
+    raw_links = load_raw_links(args.paths, args.jobs)
+
+    changed_files = None
+    if args.changed or args.since:
+        changed_files = list(args.changed or [])
+        if args.since:
+            try:
+                changed_files += git_changed_files(args.since)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f'错误: 无法获取 git 变更文件: {e}', file=sys.stderr)
+                return 2
+        warn_unscanned_docs(changed_files, raw_links)
+        graph = select_affected_links(raw_links, changed_files, slug_resolver)
+    else:
+        graph = {file_path: _to_links(file_path, items) for file_path, items in raw_links.items()}
+
+    report = check_links(graph, slug_resolver, args.jobs)
+    if changed_files is not None:
+        report['changed'] = sorted({os.path.normpath(path) for path in changed_files})
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    return 1 if report['problems'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
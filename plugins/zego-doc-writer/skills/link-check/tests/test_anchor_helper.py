@@ -0,0 +1,87 @@
+"""anchor_helper.py 锚点推荐的回归测试"""
+
+import os
+import sys
+import time
+import socket
+import tempfile
+import subprocess
+import threading
+import unittest
+
+# 测试不写入 workspace 下的解析缓存
+os.environ['ANCHOR_HELPER_CACHE'] = 'off'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from anchor_helper import call_daemon, serve_socket, suggest_anchors  # noqa: E402
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'anchor_helper.py')
+
+
+class SuggestTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'doc.mdx')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('# Doc\n\n## Login\n\n## Room\n\n## Stream\n')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_fills_top_k_when_few_anchors_share_bigrams(self):
+        # "lxq" 只与 login 有共同的二元组
+        results = suggest_anchors(self.path, 'lxq', top_k=3)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]['anchor'], 'login')
+
+    def test_query_without_bigram_overlap(self):
+        results = suggest_anchors(self.path, 'qz', top_k=3)
+        self.assertEqual(len(results), 3)
+        scores = [r['score'] for r in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_fill_is_ranked_with_prefiltered_anchors(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('## azzzzzzzzzzz\n\n## xbxdxz\n\n## qqqqqqqqqqqqqqqqqqqq\n')
+        # azzzzzzzzzzz 与查询有共同的二元组，但没有共同二元组的 xbxdxz 编辑距离更近，应排在前面
+        results = suggest_anchors(self.path, 'abcdef', top_k=5)
+        self.assertEqual([r['anchor'] for r in results], ['xbxdxz', 'azzzzzzzzzzz', 'qqqqqqqqqqqqqqqqqqqq'])
+        self.assertEqual(results[-1]['score'], 0)
+
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), '需要 Unix socket')
+class DaemonTest(unittest.TestCase):
+    def test_idle_client_does_not_block_others(self):
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, 'anchor_helper.sock')
+            server = threading.Thread(target=serve_socket, args=(socket_path, 0.1), daemon=True)
+            server.start()
+            deadline = time.monotonic() + 5
+            while not os.path.exists(socket_path) and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            # 只连接、不发送请求的客户端
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+                idle.connect(socket_path)
+                handled, _ = call_daemon('ping', {}, socket_path)
+                self.assertTrue(handled)
+
+            handled, _ = call_daemon('shutdown', {}, socket_path)
+            self.assertTrue(handled)
+            server.join(5)
+            self.assertFalse(server.is_alive())
+
+class CliTest(unittest.TestCase):
+    def test_invalid_jobs_value(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for args in (['--jobs'], ['--jobs', 'x'], ['--jobs', '-1']):
+                result = subprocess.run([sys.executable, SCRIPT, 'index', directory, *args],
+                                        capture_output=True, text=True)
+                self.assertEqual(result.returncode, 1, args)
+                self.assertIn('错误: --jobs', result.stdout, args)
+                self.assertNotIn('Traceback', result.stderr, args)
+
+
+if __name__ == '__main__':
+    unittest.main()
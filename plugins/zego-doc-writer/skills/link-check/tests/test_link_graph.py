@@ -0,0 +1,96 @@
+"""link_graph.py 增量检查的回归测试"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts', 'link_graph.py')
+
+
+def _git(cwd, *args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+class SinceTest(unittest.TestCase):
+    def setUp(self):
+        self.repo = tempfile.TemporaryDirectory()
+        root = self.repo.name
+        self.instance = os.path.join(root, 'docs', 'instance')
+        os.makedirs(self.instance)
+        self._write('a.mdx', '# A\n\n## Intro\n\n见 [B](./b.mdx#other)\n')
+        self._write('b.mdx', '# B\n\n## Other\n')
+        _git(root, 'init', '-q')
+        _git(root, 'add', '-A')
+        _git(root, 'commit', '-q', '-m', 'init')
+
+    def tearDown(self):
+        self.repo.cleanup()
+
+    def _write(self, name, content):
+        with open(os.path.join(self.instance, name), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def _run(self, instance, cwd=None):
+        result = subprocess.run([sys.executable, SCRIPT, instance, '--since', 'HEAD'],
+                                cwd=cwd or self.repo.name, capture_output=True, text=True)
+        return result.returncode, json.loads(result.stdout), result.stderr
+
+    def test_absolute_instance_path(self):
+        self._write('a.mdx', '# A\n\n## Intro\n\n见 [B](./b.mdx#missing)\n')
+        for instance in (self.instance, os.path.relpath(self.instance, self.repo.name)):
+            code, report, _ = self._run(instance)
+            self.assertEqual(code, 1, instance)
+            self.assertEqual([problem['status'] for problem in report['problems']], ['missing_anchor'], instance)
+
+    def test_changed_target_with_absolute_instance_path(self):
+        # 只修改目标文件，指向它的链接也要重新检查
+        self._write('b.mdx', '# B\n\n## Renamed\n')
+        code, report, _ = self._run(self.instance)
+        self.assertEqual(code, 1)
+        self.assertEqual([problem['source'] for problem in report['problems']],
+                         [os.path.join(self.instance, 'a.mdx')])
+
+    def test_warns_about_unscanned_docs(self):
+        other = os.path.join(self.repo.name, 'other.md')
+        with open(other, 'w', encoding='utf-8') as f:
+            f.write('# Other\n')
+        code, report, stderr = self._run(self.instance)
+        self.assertEqual(code, 0)
+        self.assertEqual(report['files'], 0)
+        self.assertIn('other.md', stderr)
+
+    def test_untracked_target_outside_cwd(self):
+        # 在子目录中运行时，子目录之外新增的未跟踪文件也算作变更
+        subdir = os.path.join(self.instance, 'zh')
+        os.makedirs(subdir)
+        self._write('c.mdx', '# C\n')
+        self._write('a.mdx', '# A\n\n## Intro\n\n见 [C](./c.mdx#x)\n')
+        _git(self.repo.name, 'commit', '-q', '-am', 'link c')
+        code, report, _ = self._run('..', cwd=subdir)
+        self.assertEqual(code, 1)
+        self.assertEqual([problem['status'] for problem in report['problems']], ['missing_anchor'])
+
+    def test_percent_encoded_link_to_changed_target(self):
+        self._write('中.mdx', '# 中\n\n## X\n')
+        self._write('a.mdx', '# A\n\n## Intro\n\n见 [中](./%E4%B8%AD.mdx#x)\n')
+        _git(self.repo.name, 'add', '-A')
+        _git(self.repo.name, 'commit', '-q', '-m', 'add zh')
+        self._write('中.mdx', '# 中\n')
+        code, report, _ = self._run(self.instance)
+        self.assertEqual(code, 1)
+        self.assertEqual([problem['source'] for problem in report['problems']],
+                         [os.path.join(self.instance, 'a.mdx')])
+
+    def test_nested_badge_link(self):
+        self._write('a.mdx', '# A\n\n[![img](./logo.png)](./b.mdx#missing)\n')
+        code, report, _ = self._run(self.instance)
+        self.assertEqual(code, 1)
+        self.assertIn('./b.mdx#missing', [problem['url'] for problem in report['problems']])
+
+
+if __name__ == '__main__':
+    unittest.main()